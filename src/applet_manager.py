@@ -1,5 +1,6 @@
 import gc
 import os
+import sys
 import uerrno
 from system_applets import base_applet
 import uasyncio as asyncio
@@ -9,24 +10,34 @@ import transitions # Import the new transitions module
 
 from system_applets.splash_applet import SplashApplet
 from system_applets.error_applet import ErrorApplet
-from applets import (
-    bitcoin_applet,
-    bitcoin_eur_applet,
-    block_height_applet,
-    fee_applet,
-    moscow_time_applet,
-    halving_countdown_applet,
-    mempool_status_applet,
-    difficulty_applet,
-    ath_applet, # Import the new applet
-    fear_and_greed_applet, # Import the Fear and Greed applet
-    dominance_applet, # Import the Bitcoin Dominance applet
-    ath_eur_applet # Import the Bitcoin EUR ATH applet
-)
 from config import ConfigManager
+from memory_policy import default_policy
+
+# Applet name -> module defining a class of the same name. Modules are only
+# imported while their applet is enabled in applets.json.
+APPLET_MODULES = {
+    "bitcoin_applet": "applets.bitcoin_applet",
+    "bitcoin_eur_applet": "applets.bitcoin_eur_applet",
+    "block_height_applet": "applets.block_height_applet",
+    "fee_applet": "applets.fee_applet",
+    "moscow_time_applet": "applets.moscow_time_applet",
+    "halving_countdown_applet": "applets.halving_countdown_applet",
+    "mempool_status_applet": "applets.mempool_status_applet",
+    "difficulty_applet": "applets.difficulty_applet",
+    "ath_applet": "applets.ath_applet",
+    "fear_and_greed_applet": "applets.fear_and_greed_applet",
+    "dominance_applet": "applets.dominance_applet",
+    "ath_eur_applet": "applets.ath_eur_applet",
+}
 
 
 class AppletManager:
+    # Seconds before the end of an applet's turn at which the next one is prefetched
+    PREFETCH_BEFORE_END = 2
+    # Longest sleep of a static applet between checks of its content version
+    # (staleness changes with time, without new data)
+    STATIC_CHECK_MS = 5000
+
     # Add config_manager parameter
     def __init__(self, screen_manager, data_manager, wifi_manager, config_manager: ConfigManager) -> None:
         self.screen_manager = screen_manager
@@ -38,29 +49,24 @@ class AppletManager:
         self.current_index = 0
         self.running = True
 
-        self.next_applet_data = None
+        self.next_applet_data = None  # (applet, data returned by its prefetch())
+        # Frames are only drawn and pushed when the applet's content version changes
+        self.frame_stats = {
+            'drawn': 0,
+            'skipped': 0
+        }
+        self.frame_timing = {}  # applet name -> {'frames', 'total_ms', 'max_ms'} of drawn frames
+        self.memory_policy = default_policy
 
-        gc.collect()
         # Remove instantiation here, use the passed instance
         # self.config_manager = ConfigManager()
 
         self._register_applets()
 
     def _register_applets(self) -> None:
-        self.all_applets = {
-            "bitcoin_applet": bitcoin_applet.bitcoin_applet,
-            "bitcoin_eur_applet": bitcoin_eur_applet.bitcoin_eur_applet,
-            "block_height_applet": block_height_applet.block_height_applet,
-            "fee_applet": fee_applet.fee_applet,
-            "moscow_time_applet": moscow_time_applet.moscow_time_applet,
-            "halving_countdown_applet": halving_countdown_applet.halving_countdown_applet,
-            "mempool_status_applet": mempool_status_applet.mempool_status_applet,
-            "difficulty_applet": difficulty_applet.difficulty_applet,
-            "ath_applet": ath_applet.ath_applet, # Add the new applet here
-            "fear_and_greed_applet": fear_and_greed_applet.fear_and_greed_applet, # Add Fear and Greed applet
-            "dominance_applet": dominance_applet.dominance_applet, # Add Bitcoin Dominance applet
-            "ath_eur_applet": ath_eur_applet.ath_eur_applet, # Add Bitcoin EUR ATH applet
-        }
+        self.all_applets = APPLET_MODULES
+        self._loaded_classes = {}  # applet name -> class, for imported modules only
+        self.import_stats = {}     # applet name -> {'import_ms', 'bytes'} of its last import
         self.applets = self.load_applets()
 
     def update_applets(self, applets, filename="applets.json"):
@@ -138,6 +144,7 @@ class AppletManager:
             return []
 
         applets = []
+        enabled = set()
         for applet in data:
             if not applet.get('enabled', False):
                 continue
@@ -145,19 +152,75 @@ class AppletManager:
             if not applet_name:
                 print(f"[AppletManager] Invalid applet entry: {applet}")
                 continue
-            applet_class = self.all_applets.get(applet_name)
+            enabled.add(applet_name)
+            applet_class = self._get_applet_class(applet_name)
             if not applet_class:
                 print(f"[AppletManager] Applet not found: {applet_name}")
                 continue
-            # Instantiate the applet
-            applet_instance = applet_class(self.screen_manager, self.data_manager)
-            # Register its data requirements with the DataManager
-            applet_instance.register()
-            applets.append(applet_instance)
+            # Instantiate the applet; its constructor registers its data requirements,
+            # which are attributed to this applet so fetches can follow the display
+            # rotation and unregister_owner() can withdraw them when it is disabled
+            self.data_manager.register_owned(
+                applet_name,
+                lambda: applets.append(applet_class(self.screen_manager, self.data_manager))
+            )
+
+        # Drop the modules of applets that are no longer enabled
+        for name in list(self._loaded_classes):
+            if name not in enabled:
+                self._unload_applet(name)
         return applets
 
     def _get_applet_class(self, name):
-        return self.all_applets.get(name)
+        """
+        Return the class of an applet, importing its module on first use.
+        :return: The class, or None if the applet is unknown or fails to import.
+        """
+        applet_class = self._loaded_classes.get(name)
+        if applet_class is not None:
+            return applet_class
+        module_name = self.all_applets.get(name)
+        if module_name is None:
+            return None
+
+        # Measure what stays resident: collect before and after the import
+        self.memory_policy.collect("import")
+        free_before = gc.mem_free()
+        start = time.ticks_ms()
+        try:
+            __import__(module_name)
+            applet_class = getattr(sys.modules[module_name], name)
+        except (ImportError, AttributeError, SyntaxError, MemoryError) as e:
+            print(f"[AppletManager] Failed to import {module_name}: {e}")
+            sys.modules.pop(module_name, None)
+            return None
+        import_ms = time.ticks_diff(time.ticks_ms(), start)
+        self.memory_policy.collect("import")
+        size = free_before - gc.mem_free()
+        self.import_stats[name] = {'import_ms': import_ms, 'bytes': size}
+        print(f"[AppletManager] Imported {module_name} in {import_ms} ms ({size} bytes)")
+        self._loaded_classes[name] = applet_class
+        return applet_class
+
+    def _unload_applet(self, name: str) -> None:
+        """
+        Forget a disabled applet: its endpoints and metrics (which may hold
+        bound methods of its instance) are withdrawn from the DataManager and
+        its module is dropped, so code, globals and instance can be collected.
+        """
+        self.data_manager.unregister_owner(name)
+        self._loaded_classes.pop(name, None)
+        module_name = self.all_applets[name]
+        sys.modules.pop(module_name, None)
+        package_name, _, attr = module_name.rpartition(".")
+        package = sys.modules.get(package_name)
+        if package is not None:
+            try:
+                delattr(package, attr)  # The package keeps a reference to imported submodules
+            except AttributeError:
+                pass
+        self.import_stats.pop(name, None)
+        print(f"[AppletManager] Unloaded {module_name}")
 
     async def start_applets(self) -> None:
         # Removed redundant enabled_applets = self.applets
@@ -197,8 +260,6 @@ class AppletManager:
 
 
     async def _run_applet(self, applet, is_system_applet: bool = False) -> None:
-        gc.collect()
-
         # --- Transition Out ---
         if self.current_applet:
             print(f"[AppletManager] Stopping applet: {self.current_applet.__class__.__name__}")
@@ -210,13 +271,17 @@ class AppletManager:
                 print(f"[AppletManager] Running exit transition: {selected_transition_name}")
                 await exit_transition(self.screen_manager) # Run exit transition before stopping
             self.current_applet.stop()
-            gc.collect()
+
+        # The old applet's objects are garbage now; collect once before the new one allocates
+        self.memory_policy.collect("transition")
 
         # --- Start New Applet ---
         print(f"[AppletManager] Starting applet: {applet.__class__.__name__}")
         self.screen_manager.clear() # Clear screen before starting new applet or entry transition
         self.current_applet = applet
         self.current_applet.start()
+        if not is_system_applet:
+            self._publish_rotation()
 
         # Prepare the applet's data *before* the transition starts
         await self.current_applet.update()
@@ -257,32 +322,95 @@ class AppletManager:
         print(f"[AppletManager] Using applet duration: {applet_duration} seconds")
 
         self.running = True
+        duration_ms = applet_duration * 1000
+        prefetch_at_ms = max(0, applet_duration - self.PREFETCH_BEFORE_END) * 1000
+        prefetched = is_system_applet
 
         try:
             start = time.ticks_ms()
+            drawn_version = self.current_applet.content_version()
             while self.running:
+                frame_start = time.ticks_ms()
+                self.data_manager.data_changed.clear()
                 await self.current_applet.update()
-                await self.current_applet.draw()
-                self.screen_manager.update()
-
-                elapsed = time.ticks_diff(time.ticks_ms(), start) / 1000
-                if elapsed >= applet_duration and not is_system_applet:
+                version = self.current_applet.content_version()
+                if version is None or version != drawn_version:
+                    await self.current_applet.draw()
+                    self.screen_manager.update()
+                    drawn_version = version
+                    self.frame_stats['drawn'] += 1
+                    self._record_frame(self.current_applet, time.ticks_diff(time.ticks_ms(), frame_start))
+                else:
+                    self.frame_stats['skipped'] += 1
+                self.memory_policy.checkpoint("frame")
+
+                elapsed_ms = time.ticks_diff(time.ticks_ms(), start)
+                if not prefetched and elapsed_ms >= prefetch_at_ms:
+                    # Prepare the next applet while this one is still on screen
+                    prefetched = True
+                    await self._prefetch_next_applet()
+                if elapsed_ms >= duration_ms and not is_system_applet:
                     await self._advance_to_next_applet()
                     break # Exit the _run_applet loop to let start_applets pick the next one
 
-                await asyncio.sleep(0.1)
+                if is_system_applet:
+                    next_event_ms = None
+                else:
+                    next_event_ms = (duration_ms if prefetched else prefetch_at_ms) - elapsed_ms
+                await self._wait_for_next_frame(self.current_applet, frame_start, next_event_ms)
 
         except Exception as e:
             await self._handle_exception(e)
-        finally:
-            gc.collect()
+
+    async def _wait_for_next_frame(self, applet, frame_start: int, next_event_ms) -> None:
+        """
+        Sleep until the applet's next frame is due: animated applets at their FPS,
+        per-second applets a second after the last frame, static ones only when
+        new data arrives (or after STATIC_CHECK_MS). Per-second applets also wake
+        for new data. Never sleeps past the next rotation
+        event (prefetch or switch).
+        :param frame_start:   ticks_ms() at which the current frame started.
+        :param next_event_ms: Milliseconds until the next rotation event, or None.
+        """
+        now = time.ticks_ms()
+        if applet.REFRESH == base_applet.REFRESH_ANIMATED:
+            wait_ms = 1000 // max(1, applet.FPS) - time.ticks_diff(now, frame_start)
+        elif applet.REFRESH == base_applet.REFRESH_PER_SECOND:
+            wait_ms = 1000 - time.ticks_diff(now, frame_start) % 1000
+        else:
+            wait_ms = self.STATIC_CHECK_MS
+        if next_event_ms is not None:
+            wait_ms = min(wait_ms, next_event_ms)
+        if wait_ms <= 0:
+            await asyncio.sleep_ms(0)  # Still let other tasks run
+        elif applet.REFRESH == base_applet.REFRESH_ANIMATED:
+            await asyncio.sleep_ms(wait_ms)
+        else:
+            try:
+                await asyncio.wait_for_ms(self.data_manager.data_changed.wait(), wait_ms)
+            except asyncio.TimeoutError:
+                pass
+
+    def _record_frame(self, applet, frame_ms: int) -> None:
+        timing = self.frame_timing.get(applet.getName())
+        if timing is None:
+            timing = {'frames': 0, 'total_ms': 0, 'max_ms': 0}
+            self.frame_timing[applet.getName()] = timing
+        timing['frames'] += 1
+        timing['total_ms'] += frame_ms
+        if frame_ms > timing['max_ms']:
+            timing['max_ms'] = frame_ms
+
+    def _publish_rotation(self) -> None:
+        """Tell the DataManager which applet is showing and what comes next, so it can fetch just in time."""
+        order = [applet.getName() for applet in self.applets]
+        self.data_manager.set_rotation(order, self.current_index, max(3, self.config_manager.get_applet_duration()))
 
     async def run_applet_once(self, applet) -> None:
-        gc.collect()
         print(f"[AppletManager] Starting applet: {applet.__class__.__name__}")
         if self.current_applet:
             self.current_applet.stop()
-            gc.collect()
+        self.memory_policy.collect("transition")
         try:
             self.screen_manager.clear()
             self.current_applet = applet
@@ -291,8 +419,23 @@ class AppletManager:
             self.screen_manager.update()
         except Exception as e:
             await self._handle_exception(e)
-        finally:
-            gc.collect()
+
+    async def _prefetch_next_applet(self) -> None:
+        """
+        Load the next applet's cached data, derived metrics and files ahead of its
+        turn, so its start and entry transition do no I/O or parsing.
+        """
+        if len(self.applets) < 2:
+            return
+        next_applet = self.applets[(self.current_index + 1) % len(self.applets)]
+        try:
+            data = await next_applet.prefetch()
+            self.data_manager.prefetch(next_applet.getName())
+            self.next_applet_data = (next_applet, data)
+        except Exception as e:
+            # A failed prefetch only means the applet loads its data on start
+            print(f"[AppletManager] Prefetch for {next_applet.getName()} failed: {e}")
+            self.next_applet_data = None
 
     async def _advance_to_next_applet(self) -> None:
         if not self.applets:
@@ -302,7 +445,9 @@ class AppletManager:
         self.current_index = (self.current_index + 1) % len(self.applets)
         next_applet = self.applets[self.current_index]
         if self.next_applet_data:
-            next_applet.set_preloaded_data(self.next_applet_data)
+            # The applet list may have changed since the prefetch
+            if self.next_applet_data[0] is next_applet:
+                next_applet.set_preloaded_data(self.next_applet_data[1])
             self.next_applet_data = None
 
         print(f"[AppletManager] Advancing to applet: {next_applet.__class__.__name__}")
@@ -315,7 +460,6 @@ class AppletManager:
         print(f"[AppletManager] Exception occurred: {exception}")
         if self.current_applet:
             self.current_applet.stop()
-            gc.collect()
 
         error_message = str(exception)
         error_applet = ErrorApplet(self.screen_manager, error_message)
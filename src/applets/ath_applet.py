@@ -3,8 +3,8 @@ from system_applets.base_applet import BaseApplet
 import ujson as json
 import os
 from data_manager import DataManager
+from derived_metrics import last_price
 from micropython import const
-import gc
 import uerrno
 import time
 
@@ -16,6 +16,7 @@ class ath_applet(BaseApplet):
     - Percentage difference from current price to ATH
     """
     TTL = const(120) # Same TTL as bitcoin_applet for current price
+    FIELDS = ("lastPrice",)
 
     def __init__(self, screen_manager: ScreenManager, data_manager: DataManager):
         super().__init__('ath_applet', screen_manager)
@@ -24,6 +25,7 @@ class ath_applet(BaseApplet):
         self.api_url = "https://api.binance.com/api/v3/ticker/24hr?symbol=BTCUSDT"
         self.current_price_data = None # Store current price data fetched in update()
         self.ath_data = None # Store ATH data loaded in start()
+        self._preloaded_ath = None # ATH data read ahead by prefetch()
         self.register()
 
     def _load_ath_data(self):
@@ -45,10 +47,24 @@ class ath_applet(BaseApplet):
             print(f"[ath_applet] Unexpected error loading ATH data: {e}")
             self.ath_data = None
 
+    async def prefetch(self):
+        # Read ath.json while the previous applet is on screen, not during the transition
+        self._load_ath_data()
+        self.data_manager.metrics.invalidate("btc_usd_vs_ath")
+        return self.ath_data
+
+    def set_preloaded_data(self, data):
+        self._preloaded_ath = data
+
     def start(self):
         # Reset data when applet starts
         self.current_price_data = None
-        self._load_ath_data() # Load ATH data when applet starts
+        if self._preloaded_ath is not None:
+            self.ath_data = self._preloaded_ath # Read by prefetch() during the previous applet
+            self._preloaded_ath = None
+        else:
+            self._load_ath_data() # Load ATH data when applet starts
+            self.data_manager.metrics.invalidate("btc_usd_vs_ath")
         super().start()
 
     def stop(self):
@@ -56,12 +72,20 @@ class ath_applet(BaseApplet):
 
     def register(self):
         # Register endpoint for current price data
-        self.data_manager.register_endpoint(self.api_url, self.TTL)
+        self.data_manager.register_endpoint(self.api_url, self.TTL, self.FIELDS)
+        self.data_manager.metrics.define("btc_usd_price", self.api_url, last_price)
+        self.data_manager.metrics.define("btc_usd_vs_ath", self.api_url, self._ath_delta)
+
+    def _ath_delta(self, data):
+        """Percentage difference between the current price and the ATH (derived metric)."""
+        ath_price = self.ath_data.get("ath_usd") if self.ath_data else None
+        if not ath_price:
+            return None
+        return ((last_price(data) - ath_price) / ath_price) * 100
 
     async def update(self):
         # Fetch current price data
         self.current_price_data = self.data_manager.get_cached_data(self.api_url)
-        gc.collect()
 
     async def draw(self):
         self.screen_manager.clear()
@@ -71,12 +95,12 @@ class ath_applet(BaseApplet):
         timestamp = None
         if isinstance(self.current_price_data, dict):
             timestamp = self.current_price_data.get('timestamp', None)
-        self.screen_manager.draw_footer(timestamp)
+        self.screen_manager.draw_footer(timestamp,
+                                        stale=self.data_manager.is_stale(self.api_url))
 
         # Check if ATH data is loaded
         if not self.ath_data or self.ath_data.get("ath_usd") is None:
             self.screen_manager.draw_centered_text("ATH Data N/A", scale=3, y_offset=0) # Centered, larger text
-            gc.collect()
             return
 
         ath_price = self.ath_data["ath_usd"]
@@ -92,17 +116,8 @@ class ath_applet(BaseApplet):
         # ATH Date (scale 2, below ATH price)
         self.screen_manager.draw_centered_text(f"{ath_date_formatted}", scale=2, y_offset=25)
         
-        # Check if current price data is available
-        current_price = None
-        if isinstance(self.current_price_data, dict):
-            price_data = self.current_price_data.get('data', {})
-            if isinstance(price_data, dict):
-                price_str = price_data.get('lastPrice')
-                if price_str is not None:
-                    try:
-                        current_price = float(price_str)
-                    except (ValueError, TypeError):
-                        print(f"[ath_applet] Error converting current price: {price_str}")
+        # Check if current price data is available (parsed once per data change)
+        current_price = self.data_manager.metrics.get("btc_usd_price")
 
         # Display Combined Current Price and Percentage Difference (scale 2)
         if current_price is not None:
@@ -120,6 +135,8 @@ class ath_applet(BaseApplet):
                 self.ath_data["ath_usd"] = current_price
                 self.ath_data["ath_date_usd"] = new_ath_date_str
                 
+                self.data_manager.metrics.invalidate("btc_usd_vs_ath")
+
                 # Update local variables for the current draw cycle
                 ath_price = current_price
                 ath_date_formatted = new_ath_date_str.split("T")[0]
@@ -131,22 +148,17 @@ class ath_applet(BaseApplet):
                 except Exception as e:
                     print(f"[ath_applet] Error writing updated ath.json: {e}")
             
-            try:
-                percentage_diff = ((current_price - ath_price) / ath_price) * 100
+            percentage_diff = self.data_manager.metrics.get("btc_usd_vs_ath")
+            if percentage_diff is not None:
                 # Combined text for current price and percentage difference
                 combined_text = f"Now: ${int(current_price):,} ({percentage_diff:+.2f}% vs ATH)"
                 text_color = self.screen_manager.theme['NEGATIVE_COLOR'] if percentage_diff < 0 else self.screen_manager.theme['MAIN_FONT_COLOR']
                 self.screen_manager.draw_centered_text(combined_text, scale=2, y_offset=60, color=text_color)
-            except ZeroDivisionError:
+            else:
                 self.screen_manager.draw_centered_text(f"Now: ${int(current_price):,} (ATH Zero)", scale=2, y_offset=60,
                                                       color=self.screen_manager.theme['NEGATIVE_COLOR'])
-            except Exception as e:
-                print(f"[ath_applet] Error calculating/displaying combined price/percentage: {e}")
-                self.screen_manager.draw_centered_text(f"Now: ${int(current_price):,} (Error %)", scale=2, y_offset=60,
-                                                     color=self.screen_manager.theme['NEGATIVE_COLOR'])
         else:
             # Current price not available (scale 2, at the combined line's y_offset)
             self.screen_manager.draw_centered_text("Current Price: Loading...", scale=2, y_offset=60)
             # If current price is loading, combined info line shows loading.
 
-        gc.collect()
@@ -3,8 +3,8 @@ from system_applets.base_applet import BaseApplet
 import ujson as json
 import os
 from data_manager import DataManager
+from derived_metrics import last_price
 from micropython import const
-import gc
 import uerrno
 import time
 
@@ -17,6 +17,7 @@ class ath_eur_applet(BaseApplet):
     - Percentage difference from current price to ATH
     """
     TTL = const(120) # For current price from Binance
+    FIELDS = ("lastPrice",)
 
     def __init__(self, screen_manager: ScreenManager, data_manager: DataManager):
         super().__init__('ath_eur_applet', screen_manager)
@@ -24,6 +25,7 @@ class ath_eur_applet(BaseApplet):
         self.api_url = "https://api.binance.com/api/v3/ticker/24hr?symbol=BTCEUR" # For current price
         self.current_price_data = None # Store current price data fetched in update()
         self.ath_data = None # Store ATH data loaded in start() from ath.json
+        self._preloaded_ath = None # ATH data read ahead by prefetch()
         self.register()
 
     def _load_ath_data(self):
@@ -45,9 +47,23 @@ class ath_eur_applet(BaseApplet):
             print(f"[ath_eur_applet] Unexpected error loading ATH data: {e}")
             self.ath_data = None
 
+    async def prefetch(self):
+        # Read ath.json while the previous applet is on screen, not during the transition
+        self._load_ath_data()
+        self.data_manager.metrics.invalidate("btc_eur_vs_ath")
+        return self.ath_data
+
+    def set_preloaded_data(self, data):
+        self._preloaded_ath = data
+
     def start(self):
         self.current_price_data = None
-        self._load_ath_data() # Load ATH data from file
+        if self._preloaded_ath is not None:
+            self.ath_data = self._preloaded_ath # Read by prefetch() during the previous applet
+            self._preloaded_ath = None
+        else:
+            self._load_ath_data() # Load ATH data from file
+            self.data_manager.metrics.invalidate("btc_eur_vs_ath")
         super().start()
 
     def stop(self):
@@ -55,12 +71,20 @@ class ath_eur_applet(BaseApplet):
 
     def register(self):
         # Register endpoint for current price data from Binance
-        self.data_manager.register_endpoint(self.api_url, self.TTL)
+        self.data_manager.register_endpoint(self.api_url, self.TTL, self.FIELDS)
+        self.data_manager.metrics.define("btc_eur_price", self.api_url, last_price)
+        self.data_manager.metrics.define("btc_eur_vs_ath", self.api_url, self._ath_delta)
+
+    def _ath_delta(self, data):
+        """Percentage difference between the current price and the ATH (derived metric)."""
+        ath_price = self.ath_data.get("ath_eur") if self.ath_data else None
+        if not ath_price:
+            return None
+        return ((last_price(data) - ath_price) / ath_price) * 100
 
     async def update(self):
         # Fetch current price data from Binance
         self.current_price_data = self.data_manager.get_cached_data(self.api_url)
-        gc.collect()
 
     async def draw(self):
         self.screen_manager.clear()
@@ -69,12 +93,12 @@ class ath_eur_applet(BaseApplet):
         timestamp = None
         if isinstance(self.current_price_data, dict): # Timestamp from current price fetch
             timestamp = self.current_price_data.get('timestamp', None)
-        self.screen_manager.draw_footer(timestamp)
+        self.screen_manager.draw_footer(timestamp,
+                                        stale=self.data_manager.is_stale(self.api_url))
 
         # Check if ATH data is loaded from ath.json
         if not self.ath_data or self.ath_data.get("ath_eur") is None:
             self.screen_manager.draw_centered_text("ATH EUR Data N/A", scale=3, y_offset=0)
-            gc.collect()
             return
 
         ath_price_eur = self.ath_data["ath_eur"]
@@ -90,18 +114,9 @@ class ath_eur_applet(BaseApplet):
         # ATH Date (scale 2, below ATH price)
         self.screen_manager.draw_centered_text(f"{ath_date_formatted}", scale=2, y_offset=25)
         
-        # Check if current price data is available (from Binance)
-        current_price_eur = None
-        if isinstance(self.current_price_data, dict):
-            price_data = self.current_price_data.get('data', {}) # Binance data structure
-            if isinstance(price_data, dict):
-                price_str = price_data.get('lastPrice')
-                if price_str is not None:
-                    try:
-                        current_price_eur = float(price_str)
-                    except (ValueError, TypeError):
-                        print(f"[ath_eur_applet] Error converting current EUR price: {price_str}")
-        
+        # Check if current price data is available (parsed once per data change)
+        current_price_eur = self.data_manager.metrics.get("btc_eur_price")
+
         # Display Combined Current Price and Percentage Difference (scale 2)
         if current_price_eur is not None:
             # Check for new ATH before calculating percentage
@@ -118,6 +133,8 @@ class ath_eur_applet(BaseApplet):
                 self.ath_data["ath_eur"] = current_price_eur
                 self.ath_data["ath_date_eur"] = new_ath_date_str
 
+                self.data_manager.metrics.invalidate("btc_eur_vs_ath")
+
                 # Update local variables for the current draw cycle
                 ath_price_eur = current_price_eur # This was the variable name used below
                 ath_date_formatted = new_ath_date_str.split("T")[0]
@@ -129,19 +146,15 @@ class ath_eur_applet(BaseApplet):
                 except Exception as e:
                     print(f"[ath_eur_applet] Error writing updated ath.json: {e}")
 
-            try:
-                percentage_diff = ((current_price_eur - ath_price_eur) / ath_price_eur) * 100
+            percentage_diff = self.data_manager.metrics.get("btc_eur_vs_ath")
+            if percentage_diff is not None:
+                # Combined text for current price and percentage difference
                 combined_text = f"Now: E{int(current_price_eur):,} ({percentage_diff:+.2f}% vs ATH)" # Euro symbol replaced with E, space removed
                 text_color = self.screen_manager.theme['NEGATIVE_COLOR'] if percentage_diff < 0 else self.screen_manager.theme['MAIN_FONT_COLOR']
                 self.screen_manager.draw_centered_text(combined_text, scale=2, y_offset=60, color=text_color)
-            except ZeroDivisionError:
+            else:
                 self.screen_manager.draw_centered_text(f"Now: E{int(current_price_eur):,} (ATH Zero)", scale=2, y_offset=60, # Euro symbol replaced with E, space removed
                                                       color=self.screen_manager.theme['NEGATIVE_COLOR'])
-            except Exception as e:
-                print(f"[ath_eur_applet] Error calculating/displaying combined price/percentage: {e}")
-                self.screen_manager.draw_centered_text(f"Now: E{int(current_price_eur):,} (Error %)", scale=2, y_offset=60, # Euro symbol replaced with E, space removed
-                                                     color=self.screen_manager.theme['NEGATIVE_COLOR'])
         else:
             self.screen_manager.draw_centered_text("Current Price: Loading...", scale=2, y_offset=60)
 
-        gc.collect()
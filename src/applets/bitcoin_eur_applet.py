@@ -1,11 +1,12 @@
 from screen_manager import ScreenManager
 from system_applets.base_applet import BaseApplet
 from data_manager import DataManager
+from derived_metrics import last_price, price_change_percent
 from micropython import const
-import gc
 
 class bitcoin_eur_applet(BaseApplet):
     TTL = const(120)
+    FIELDS = ("lastPrice", "priceChangePercent")
 
     def __init__(self, screen_manager: ScreenManager, data_manager: DataManager):
         super().__init__('bitcoin_eur_applet', screen_manager)
@@ -25,13 +26,14 @@ class bitcoin_eur_applet(BaseApplet):
 
     def register(self):
         # Register with default TTL from BaseApplet if not specified otherwise
-        self.data_manager.register_endpoint(self.api_url, self.TTL)
+        self.data_manager.register_endpoint(self.api_url, self.TTL, self.FIELDS)
+        self.data_manager.metrics.define("btc_eur_price", self.api_url, last_price)
+        self.data_manager.metrics.define("btc_eur_change", self.api_url, price_change_percent)
 
     async def update(self):
         # Fetch data in update
         self.current_data = self.data_manager.get_cached_data(self.api_url)
         # print(f"[bitcoin_eur_applet] Updated data: {self.current_data}") # Optional debug
-        gc.collect()
         # No need to call super().update()
 
     async def draw(self):
@@ -44,62 +46,48 @@ class bitcoin_eur_applet(BaseApplet):
             # No footer if no data
         elif isinstance(self.current_data, dict):
             # Draw timestamp from the outer cache dictionary
-            self.screen_manager.draw_footer(self.current_data.get('timestamp', None))
-
-            # Access the nested 'data' dictionary which holds the actual API response
-            bitcoin_data = self.current_data.get('data', {})
-            if not isinstance(bitcoin_data, dict):
-                 print(f"[bitcoin_eur_applet] Unexpected data format: {bitcoin_data}")
-                 self.screen_manager.draw_centered_text("Data Error")
-                 gc.collect()
-                 return
-
-            price = bitcoin_data.get('lastPrice')
-            change_percent = bitcoin_data.get('priceChangePercent')
-
-            if price is not None and change_percent is not None:
-                try:
-                    eur_price = float(price)
-                    change = float(change_percent)
-
-                    # Draw the label, price and change
-                    self.screen_manager.draw_centered_text("BTC/EUR", scale=3, y_offset=-60)
-                    # Use "E" without space for bitmap font compatibility
-                    self.screen_manager.draw_centered_text(f"E{int(eur_price):,}")
-
-                    # Draw the change percentage with indicator triangle
-                    change_text = f"24h change: {change:+.2f}%"
-                    text_width = self.screen_manager.display.measure_text(change_text, scale=2)
-                    x = (self.screen_manager.width - text_width) // 2
-                    y = (self.screen_manager.height - 16) // 2 + 60 # 16 = text height scale 2
-
-                    triangle_size = 10
-                    triangle_x = x - triangle_size - 5
-                    triangle_y = y + 8 # Approx vertical center
-
-                    triangle_color_name = "POSITIVE_COLOR" if change >= 0 else "NEGATIVE_COLOR"
-                    triangle_color = self.screen_manager.theme[triangle_color_name]
-                    self.screen_manager.display.set_pen(self.screen_manager.get_pen(triangle_color))
-
-                    if change >= 0: # Upward triangle
-                        self.screen_manager.display.triangle(
-                            triangle_x, triangle_y,
-                            triangle_x + triangle_size, triangle_y,
-                            triangle_x + (triangle_size // 2), triangle_y - triangle_size
-                        )
-                    else: # Downward triangle
-                        self.screen_manager.display.triangle(
-                            triangle_x, triangle_y - triangle_size,
-                            triangle_x + triangle_size, triangle_y - triangle_size,
-                            triangle_x + (triangle_size // 2), triangle_y
-                        )
-
-                    # Draw the text (use default color)
-                    self.screen_manager.draw_text(change_text, x, y, scale=2)
-
-                except (ValueError, TypeError) as e:
-                    print(f"[bitcoin_eur_applet] Error converting values: {e}")
-                    self.screen_manager.draw_centered_text("Data Error")
+            self.screen_manager.draw_footer(self.current_data.get('timestamp', None),
+                                            stale=self.data_manager.is_stale(self.api_url))
+
+            # Parsed once per data change by DataManager's derived metrics
+            eur_price = self.data_manager.metrics.get("btc_eur_price")
+            change = self.data_manager.metrics.get("btc_eur_change")
+
+            if eur_price is not None and change is not None:
+                # Draw the label, price and change
+                self.screen_manager.draw_centered_text("BTC/EUR", scale=3, y_offset=-60)
+                # Use "E" without space for bitmap font compatibility
+                self.screen_manager.draw_centered_text(f"E{int(eur_price):,}")
+
+                # Draw the change percentage with indicator triangle
+                change_text = f"24h change: {change:+.2f}%"
+                text_width = self.screen_manager.display.measure_text(change_text, scale=2)
+                x = (self.screen_manager.width - text_width) // 2
+                y = (self.screen_manager.height - 16) // 2 + 60 # 16 = text height scale 2
+
+                triangle_size = 10
+                triangle_x = x - triangle_size - 5
+                triangle_y = y + 8 # Approx vertical center
+
+                triangle_color_name = "POSITIVE_COLOR" if change >= 0 else "NEGATIVE_COLOR"
+                triangle_color = self.screen_manager.theme[triangle_color_name]
+                self.screen_manager.display.set_pen(self.screen_manager.get_pen(triangle_color))
+
+                if change >= 0: # Upward triangle
+                    self.screen_manager.display.triangle(
+                        triangle_x, triangle_y,
+                        triangle_x + triangle_size, triangle_y,
+                        triangle_x + (triangle_size // 2), triangle_y - triangle_size
+                    )
+                else: # Downward triangle
+                    self.screen_manager.display.triangle(
+                        triangle_x, triangle_y - triangle_size,
+                        triangle_x + triangle_size, triangle_y - triangle_size,
+                        triangle_x + (triangle_size // 2), triangle_y
+                    )
+
+                # Draw the text (use default color)
+                self.screen_manager.draw_text(change_text, x, y, scale=2)
             else:
                 self.screen_manager.draw_centered_text("N/A") # Handle missing data
         else:
@@ -108,4 +96,3 @@ class bitcoin_eur_applet(BaseApplet):
 
         # screen_manager.update() is called by AppletManager or transition
         # self.drawn flag removed
-        gc.collect()
@@ -1,11 +1,11 @@
 from system_applets.base_applet import BaseApplet
 from data_manager import DataManager
 from micropython import const
-import gc
 import time
 
 class difficulty_applet(BaseApplet):
     TTL = const(300)
+    MEMPOOL_FIELDS = ("progressPercent", "estimatedRetargetDate", "remainingBlocks", "difficultyChange")
 
     def __init__(self, screen_manager, data_manager: DataManager):
         super().__init__('difficulty_applet', screen_manager)
@@ -28,14 +28,13 @@ class difficulty_applet(BaseApplet):
         super().stop()
 
     def register(self):
-        self.data_manager.register_endpoint(self.mempool_api, self.TTL)
+        self.data_manager.register_endpoint(self.mempool_api, self.TTL, self.MEMPOOL_FIELDS)
         self.data_manager.register_endpoint(self.blockchain_api, self.TTL)
 
     async def update(self):
         # Fetch data for both endpoints
         self.mempool_data = self.data_manager.get_cached_data(self.mempool_api)
         self.difficulty_data = self.data_manager.get_cached_data(self.blockchain_api)
-        gc.collect()
         # No need to call super().update()
 
     def draw_kv(self, label: str, value: str, y: int):
@@ -54,11 +53,11 @@ class difficulty_applet(BaseApplet):
         if self.mempool_data is None or self.difficulty_data is None:
             self.screen_manager.draw_centered_text("Loading...")
             # No footer if no data
-            gc.collect()
             return
 
         # Use mempool data timestamp for footer as it's more detailed
-        self.screen_manager.draw_footer(self.mempool_data.get('timestamp', None))
+        self.screen_manager.draw_footer(self.mempool_data.get('timestamp', None),
+                                        stale=self.data_manager.is_stale(self.mempool_api))
 
         # Extract nested data dictionaries
         mempool_raw = self.mempool_data.get("data", {})
@@ -138,4 +137,3 @@ class difficulty_applet(BaseApplet):
 
         # screen_manager.update() is called by AppletManager or transition
         # self.drawn flag removed
-        gc.collect()
@@ -2,7 +2,6 @@ from screen_manager import ScreenManager
 from system_applets.base_applet import BaseApplet
 from data_manager import DataManager
 from micropython import const
-import gc
 
 class dominance_applet(BaseApplet):
     """
@@ -10,6 +9,7 @@ class dominance_applet(BaseApplet):
     Data from: https://api.coingecko.com/api/v3/global
     """
     TTL = const(600)  # 10 minutes
+    FIELDS = ("data.market_cap_percentage.btc", "data.updated_at")
     API_URL = "https://api.coingecko.com/api/v3/global"
 
     def __init__(self, screen_manager: ScreenManager, data_manager: DataManager):
@@ -19,7 +19,7 @@ class dominance_applet(BaseApplet):
         self.register()
 
     def register(self):
-        self.data_manager.register_endpoint(self.API_URL, self.TTL)
+        self.data_manager.register_endpoint(self.API_URL, self.TTL, self.FIELDS)
 
     def start(self):
         self.current_data = None
@@ -30,7 +30,6 @@ class dominance_applet(BaseApplet):
 
     async def update(self):
         self.current_data = self.data_manager.get_cached_data(self.API_URL)
-        gc.collect()
 
     async def draw(self):
         self.screen_manager.clear()
@@ -45,18 +44,17 @@ class dominance_applet(BaseApplet):
                 coingecko_internal_data = api_response_data.get('data', {})
                 if isinstance(coingecko_internal_data, dict):
                     timestamp = coingecko_internal_data.get("updated_at")
-        self.screen_manager.draw_footer(timestamp)
+        self.screen_manager.draw_footer(timestamp,
+                                        stale=self.data_manager.is_stale(self.API_URL))
 
         if self.current_data is None:
             self.screen_manager.draw_centered_text("Loading...")
-            gc.collect()
             return
 
         api_response_data = self.current_data.get('data', {})
         if not isinstance(api_response_data, dict):
             print(f"[dominance_applet] API Error or unexpected data format: {api_response_data}")
             self.screen_manager.draw_centered_text("API Error")
-            gc.collect()
             return
 
         # Extract dominance data
@@ -66,14 +64,12 @@ class dominance_applet(BaseApplet):
         if not isinstance(coingecko_internal_data, dict):
             self.screen_manager.draw_centered_text("Data Error")
             print(f"[dominance_applet] CoinGecko internal 'data' object not found or not a dict.")
-            gc.collect()
             return
 
         market_cap_percentage_data = coingecko_internal_data.get('market_cap_percentage', {})
         if not isinstance(market_cap_percentage_data, dict):
             self.screen_manager.draw_centered_text("Data Error")
             print(f"[dominance_applet] market_cap_percentage not found or not a dict in CoinGecko data.")
-            gc.collect()
             return
             
         btc_dominance = market_cap_percentage_data.get('btc')
@@ -81,7 +77,6 @@ class dominance_applet(BaseApplet):
         if btc_dominance is None:
             self.screen_manager.draw_centered_text("No Data")
             print(f"[dominance_applet] btc_dominance value not found.")
-            gc.collect()
             return
 
         try:
@@ -135,4 +130,3 @@ class dominance_applet(BaseApplet):
             print(f"[dominance_applet] Error converting dominance value or drawing bar: {e}")
             self.screen_manager.draw_centered_text("Data Error")
 
-        gc.collect()
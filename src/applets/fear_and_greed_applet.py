@@ -2,7 +2,6 @@ from screen_manager import ScreenManager
 from system_applets.base_applet import BaseApplet
 from data_manager import DataManager
 from micropython import const
-import gc
 import ujson
 
 class fear_and_greed_applet(BaseApplet):
@@ -14,6 +13,7 @@ class fear_and_greed_applet(BaseApplet):
     """
     # API updates daily. Cache for 4 hours (4 * 60 * 60 = 14400 seconds)
     TTL = const(14400)
+    FIELDS = ("metadata.error", "data.0.value", "data.0.value_classification")
     API_URL = "https://api.alternative.me/fng/"
 
     def __init__(self, screen_manager: ScreenManager, data_manager: DataManager):
@@ -23,7 +23,7 @@ class fear_and_greed_applet(BaseApplet):
         self.register()
 
     def register(self):
-        self.data_manager.register_endpoint(self.API_URL, self.TTL)
+        self.data_manager.register_endpoint(self.API_URL, self.TTL, self.FIELDS)
 
     def start(self):
         self.current_data = None
@@ -34,7 +34,6 @@ class fear_and_greed_applet(BaseApplet):
 
     async def update(self):
         self.current_data = self.data_manager.get_cached_data(self.API_URL)
-        gc.collect()
 
     def _calculate_color_for_index(self, index_value):
         """Calculates RGB color for a given index value (0-100)."""
@@ -62,11 +61,11 @@ class fear_and_greed_applet(BaseApplet):
             # Use the timestamp from the DataManager's cache entry,
             # which reflects when our system last fetched the data.
             timestamp = self.current_data.get('timestamp', None)
-        self.screen_manager.draw_footer(timestamp)
+        self.screen_manager.draw_footer(timestamp,
+                                        stale=self.data_manager.is_stale(self.API_URL))
 
         if self.current_data is None:
             self.screen_manager.draw_centered_text("Loading...")
-            gc.collect()
             return
 
         api_response_data = self.current_data.get('data', {})
@@ -74,13 +73,11 @@ class fear_and_greed_applet(BaseApplet):
             error_msg = api_response_data.get("metadata", {}).get("error", "API Error")
             print(f"[fng_applet] API Error: {error_msg}")
             self.screen_manager.draw_centered_text("API Error")
-            gc.collect()
             return
 
         fng_data_list = api_response_data.get('data', [])
         if not fng_data_list or not isinstance(fng_data_list, list):
             self.screen_manager.draw_centered_text("No Data")
-            gc.collect()
             return
 
         try:
@@ -90,7 +87,6 @@ class fear_and_greed_applet(BaseApplet):
         except (ValueError, TypeError, IndexError, AttributeError) as e:
             print(f"[fng_applet] Error parsing FNG data: {e}")
             self.screen_manager.draw_centered_text("Data Error")
-            gc.collect()
             return
 
         # --- Drawing the F&G Index Bar and Indicator ---
@@ -142,4 +138,3 @@ class fear_and_greed_applet(BaseApplet):
         # Draw the classification text below the bar
         self.screen_manager.draw_centered_text(value_classification, scale=3, y_offset=35) # y_offset relative to screen center
 
-        gc.collect()
@@ -1,10 +1,10 @@
 from system_applets.base_applet import BaseApplet
 from data_manager import DataManager
 from micropython import const
-import gc
 
 class fee_applet(BaseApplet):
     TTL = const(120)
+    FIELDS = ("fastestFee", "halfHourFee", "hourFee")
     def __init__(self, screen_manager, data_manager: DataManager):
         super().__init__('fee_applet', screen_manager)
         self.data_manager = data_manager
@@ -22,12 +22,11 @@ class fee_applet(BaseApplet):
         super().stop()
 
     def register(self):
-        self.data_manager.register_endpoint(self.api_url, self.TTL)
+        self.data_manager.register_endpoint(self.api_url, self.TTL, self.FIELDS)
 
     async def update(self):
         # Fetch data in update
         self.current_data = self.data_manager.get_cached_data(self.api_url)
-        gc.collect()
         # No need to call super().update()
 
     async def draw(self):
@@ -38,18 +37,17 @@ class fee_applet(BaseApplet):
         if self.current_data is None:
             self.screen_manager.draw_centered_text("Loading...")
             # No footer if no data
-            gc.collect()
             return
 
         # Draw timestamp from the outer cache dictionary
-        self.screen_manager.draw_footer(self.current_data.get('timestamp', None))
+        self.screen_manager.draw_footer(self.current_data.get('timestamp', None),
+                                        stale=self.data_manager.is_stale(self.api_url))
 
         # Access the nested 'data' dictionary which holds the actual API response
         fee_data = self.current_data.get('data', {})
         if not isinstance(fee_data, dict):
             print(f"[fee_applet] Unexpected data format: {fee_data}")
             self.screen_manager.draw_centered_text("Data Error")
-            gc.collect()
             return
 
         y = 60 # Starting Y position for fee lines
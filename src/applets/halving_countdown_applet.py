@@ -1,7 +1,6 @@
 from system_applets.base_applet import BaseApplet
 from data_manager import DataManager
 from micropython import const
-import gc
 
 class halving_countdown_applet(BaseApplet):
     TTL = const(120)
@@ -35,7 +34,6 @@ class halving_countdown_applet(BaseApplet):
 
     async def update(self):
         self.current_data = self.data_manager.get_cached_data(self.api_url)
-        gc.collect()
 
     async def draw(self):
         self.screen_manager.clear()
@@ -45,7 +43,8 @@ class halving_countdown_applet(BaseApplet):
             self.screen_manager.draw_centered_text("Loading...")
             # No footer if no data
         else:
-            self.screen_manager.draw_footer(self.current_data.get('timestamp', None))
+            self.screen_manager.draw_footer(self.current_data.get('timestamp', None),
+                                            stale=self.data_manager.is_stale(self.api_url))
             try:
                 current_height = int(self.current_data.get('data', 0))
                 if current_height > 0:
@@ -57,4 +56,3 @@ class halving_countdown_applet(BaseApplet):
                 print("Error processing block height:", e)
                 self.screen_manager.draw_centered_text("Error") # Display error on screen
 
-        gc.collect()
@@ -1,10 +1,10 @@
 from system_applets.base_applet import BaseApplet
 from data_manager import DataManager
 from micropython import const
-import gc
 
 class mempool_status_applet(BaseApplet):
     TTL = const(60)
+    FIELDS = ("count", "vsize")
 
     def __init__(self, screen_manager, data_manager: DataManager):
         super().__init__('mempool_status_applet', screen_manager)
@@ -24,12 +24,11 @@ class mempool_status_applet(BaseApplet):
         super().stop()
 
     def register(self):
-        self.data_manager.register_endpoint(self.api_url, self.TTL)
+        self.data_manager.register_endpoint(self.api_url, self.TTL, self.FIELDS)
 
     async def update(self):
         # Fetch new data
         self.current_data = self.data_manager.get_cached_data(self.api_url)
-        gc.collect()
         # No need to call super().update()
 
     async def draw(self):
@@ -40,18 +39,17 @@ class mempool_status_applet(BaseApplet):
         if self.current_data is None:
             self.screen_manager.draw_centered_text("Loading...")
             # No footer if no data
-            gc.collect()
             return
 
         # Draw timestamp from the outer cache dictionary
-        self.screen_manager.draw_footer(self.current_data.get('timestamp', None))
+        self.screen_manager.draw_footer(self.current_data.get('timestamp', None),
+                                        stale=self.data_manager.is_stale(self.api_url))
 
         # Access the nested 'data' dictionary which holds the actual API response
         mempool_data = self.current_data.get('data', {})
         if not isinstance(mempool_data, dict):
             print(f"[mempool_status_applet] Unexpected data format: {mempool_data}")
             self.screen_manager.draw_centered_text("Data Error")
-            gc.collect()
             return
 
         try:
@@ -89,4 +87,3 @@ class mempool_status_applet(BaseApplet):
 
         # screen_manager.update() is called by AppletManager or transition
         # self.drawn flag removed
-        gc.collect()
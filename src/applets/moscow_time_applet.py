@@ -1,10 +1,11 @@
 from system_applets.base_applet import BaseApplet
 from data_manager import DataManager
+from derived_metrics import sats_per_unit
 from micropython import const
-import gc
 
 class moscow_time_applet(BaseApplet):
     TTL = const(120)
+    FIELDS = ("lastPrice",)
 
     def __init__(self, screen_manager, data_manager: DataManager):
         super().__init__('moscow_time_applet', screen_manager)
@@ -24,12 +25,12 @@ class moscow_time_applet(BaseApplet):
 
     def register(self):
         # Register with default TTL from BaseApplet if not specified otherwise
-        self.data_manager.register_endpoint(self.api_url, self.TTL)
+        self.data_manager.register_endpoint(self.api_url, self.TTL, self.FIELDS)
+        self.data_manager.metrics.define("sats_per_usd", self.api_url, sats_per_unit)
 
     async def update(self):
         # Fetch data in update
         self.current_data = self.data_manager.get_cached_data(self.api_url)
-        gc.collect()
         # No need to call super().update()
 
     async def draw(self):
@@ -40,44 +41,24 @@ class moscow_time_applet(BaseApplet):
         if self.current_data is None:
             self.screen_manager.draw_centered_text("Loading...")
             # No footer if no data
-            gc.collect()
             return
 
         # Draw timestamp from the outer cache dictionary
-        self.screen_manager.draw_footer(self.current_data.get('timestamp', None))
+        self.screen_manager.draw_footer(self.current_data.get('timestamp', None),
+                                        stale=self.data_manager.is_stale(self.api_url))
 
-        # Access the nested 'data' dictionary which holds the actual API response
-        bitcoin_data = self.current_data.get('data', {})
-        if not isinstance(bitcoin_data, dict):
-            print(f"[moscow_time_applet] Unexpected data format: {bitcoin_data}")
-            self.screen_manager.draw_centered_text("Data Error")
-            gc.collect()
-            return
-
-        price = bitcoin_data.get('lastPrice')
-
-        if price is not None:
-            try:
-                btc_price = float(price)
-                if btc_price > 0:  # Check price is positive
-                    # Calculate Moscow Time (sats per dollar)
-                    moscow_time = int(100_000_000 / btc_price)
+        # Sats per dollar, recomputed by DataManager only when the price changes
+        moscow_time = self.data_manager.metrics.get("sats_per_usd")
 
-                    # Format as clock display (e.g., 15:32)
-                    # Ensure it handles cases like 100 sats -> 01:00
-                    display_time = f"{moscow_time//100:02d}:{moscow_time%100:02d}"
+        if moscow_time is not None:
+            # Format as clock display (e.g., 15:32)
+            # Ensure it handles cases like 100 sats -> 01:00
+            display_time = f"{moscow_time//100:02d}:{moscow_time%100:02d}"
 
-                    self.screen_manager.draw_centered_text(display_time, scale=12)
-                else:
-                    print("[moscow_time_applet] BTC price is zero or negative, cannot calculate Moscow Time.")
-                    self.screen_manager.draw_centered_text("N/A")
-            except (ValueError, TypeError) as e:
-                print(f"[moscow_time_applet] Error converting values: {e}")
-                self.screen_manager.draw_centered_text("Data Error")
+            self.screen_manager.draw_centered_text(display_time, scale=12)
         else:
-            # Handle missing price data
+            # Missing, malformed or non-positive price
             self.screen_manager.draw_centered_text("N/A")
 
         # screen_manager.update() is called by AppletManager or transition
         # self.drawn flag removed
-        gc.collect()
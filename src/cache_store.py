@@ -0,0 +1,224 @@
+import json
+import os
+import ubinascii
+
+
+class CacheStore:
+    """
+    Persistent key/value store backed by a single append-only log file.
+
+    Each record is one line: "<crc32 as 8 hex digits> <json>\\n", where the JSON is
+    {"k": key, "v": value} or, for deletions, {"k": key}. A record counts only if
+    its line is complete and its checksum matches, so a write interrupted by a
+    power cut is simply ignored on the next boot (atomic commit).
+
+    An in-RAM index maps each full key (no hashing, so no collisions) to the
+    offset of its latest record, so reads are a single seek + read and no
+    per-key files are opened or stat'ed. When the log outgrows its quota or is
+    mostly dead records, live records are rewritten into a fresh file that
+    atomically replaces the old one; if live data alone exceeds the quota, the
+    least recently written keys are evicted.
+    """
+
+    def __init__(self, path: str, quota_bytes: int = 32 * 1024) -> None:
+        """
+        :param path:        Path of the log file.
+        :param quota_bytes: Maximum size of the log file.
+        """
+        self.path = path
+        self.quota_bytes = quota_bytes
+        self._index = {}  # key -> [payload offset, payload length, write sequence]
+        self._seq = 0
+        self._log_bytes = 0
+        self._live_bytes = 0
+        self.writes = 0
+        self.compactions = 0
+        self.evictions = 0
+        self._load()
+
+    def _load(self) -> None:
+        """
+        Rebuild the index by scanning the log. Stops at the first damaged record and
+        rewrites the log without it.
+        """
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return  # No log yet
+
+        damaged = False
+        offset = 0
+        with f:
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                record = self._decode(line)
+                if record is None:
+                    print(f"[CacheStore] Discarding damaged record at offset {offset}")
+                    damaged = True
+                    break
+                # Payload starts after "xxxxxxxx "
+                self._apply(record, offset + 9, len(line) - 10)
+                offset += len(line)
+        self._log_bytes = offset
+        print(f"[CacheStore] Loaded {len(self._index)} entries from {self.path}")
+        if damaged:
+            self.compact()
+
+    def _decode(self, line: bytes):
+        """
+        Validate and parse one log line.
+        :return: The record dict, or None if the line is truncated or corrupt.
+        """
+        if len(line) < 11 or line[-1:] != b"\n" or line[8:9] != b" ":
+            return None
+        payload = line[9:-1]
+        try:
+            if int(line[:8], 16) != ubinascii.crc32(payload) & 0xFFFFFFFF:
+                return None
+            return json.loads(payload)
+        except ValueError:
+            return None
+
+    def _apply(self, record: dict, offset: int, length: int) -> None:
+        """
+        Update the index for a record located at `offset` in the log.
+        """
+        key = record.get("k")
+        old = self._index.pop(key, None)
+        if old is not None:
+            self._live_bytes -= old[1] + 10
+        if "v" in record:
+            self._seq += 1
+            self._index[key] = [offset, length, self._seq]
+            self._live_bytes += length + 10
+
+    def _append(self, record: dict) -> int:
+        """
+        Append one record with a single write and update the index once it is flushed.
+        :return: Size of the serialized record payload in bytes.
+        """
+        payload = json.dumps(record).encode()
+        line = b"%08x %s\n" % (ubinascii.crc32(payload) & 0xFFFFFFFF, payload)
+        with open(self.path, "ab") as f:
+            f.write(line)
+            f.flush()
+        self._apply(record, self._log_bytes + 9, len(payload))
+        self._log_bytes += len(line)
+        self.writes += 1
+
+        if self._log_bytes > self.quota_bytes:
+            self.compact()
+        else:
+            self.maybe_compact()
+        return len(payload)
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def keys(self):
+        return list(self._index.keys())
+
+    def get(self, key, default=None):
+        """
+        Read the latest value stored for `key`.
+        """
+        value, _ = self.get_with_size(key, default)
+        return value
+
+    def get_with_size(self, key, default=None):
+        """
+        :return: Tuple of (value, serialized size in bytes), or (default, 0) if absent.
+        """
+        entry = self._index.get(key)
+        if entry is None:
+            return default, 0
+        with open(self.path, "rb") as f:
+            f.seek(entry[0])
+            payload = f.read(entry[1])
+        return json.loads(payload)["v"], entry[1]
+
+    def put(self, key, value) -> int:
+        """
+        Durably store `value` under `key`, replacing any previous value.
+        :return: Serialized size of the record in bytes.
+        """
+        return self._append({"k": key, "v": value})
+
+    def delete(self, key) -> None:
+        """
+        Remove `key` from the store (no-op if absent).
+        """
+        if key in self._index:
+            self._append({"k": key})
+
+    def retain(self, keys) -> None:
+        """
+        Evict every entry whose key is not in `keys`.
+        :param keys: Collection of keys that are still in use.
+        """
+        stale = [key for key in self._index if key not in keys]
+        for key in stale:
+            print(f"[CacheStore] Evicting unused entry {key}")
+            self._append({"k": key})
+        self.evictions += len(stale)
+
+    def compact(self) -> None:
+        """
+        Rewrite the log with only the live records, evicting the least recently
+        written ones if they still exceed the quota. The new log replaces the old
+        one with an atomic rename.
+        """
+        # Keep the most recent entries that fit in the quota
+        entries = sorted(self._index.items(), key=lambda item: item[1][2], reverse=True)
+        kept = []
+        total = 0
+        for key, entry in entries:
+            size = entry[1] + 10
+            if total + size > self.quota_bytes:
+                self.evictions += 1
+                print(f"[CacheStore] Quota exceeded, evicting {key}")
+                continue
+            kept.append((key, entry))
+            total += size
+        kept.reverse()  # Preserve write order
+
+        tmp_path = self.path + ".tmp"
+        new_index = {}
+        offset = 0
+        with open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+            for key, entry in kept:
+                src.seek(entry[0] - 9)
+                line = src.read(entry[1] + 10)
+                dst.write(line)
+                new_index[key] = [offset + 9, entry[1], entry[2]]
+                offset += len(line)
+        os.rename(tmp_path, self.path)
+
+        self._index = new_index
+        self._log_bytes = offset
+        self._live_bytes = offset
+        self.compactions += 1
+        print(f"[CacheStore] Compacted {self.path} to {offset} bytes ({len(new_index)} entries)")
+
+    def maybe_compact(self) -> None:
+        """
+        Compact when more than half of the log is dead records.
+        """
+        if self._log_bytes > 4096 and self._live_bytes * 2 < self._log_bytes:
+            self.compact()
+
+    def stats(self) -> dict:
+        """
+        :return: Size and activity counters.
+        """
+        return {
+            "entries": len(self._index),
+            "log_bytes": self._log_bytes,
+            "live_bytes": self._live_bytes,
+            "quota_bytes": self.quota_bytes,
+            "writes": self.writes,
+            "compactions": self.compactions,
+            "evictions": self.evictions,
+        }
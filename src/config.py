@@ -14,7 +14,9 @@ class ConfigManager:
             "applet_duration": 10,      # Default duration in seconds
             "timezone_offset": 0,       # Default timezone offset (UTC)
             "transition_effect": "None", # Default transition effect
-            "ip_address": "N/A"         # Default IP address
+            "ip_address": "N/A",        # Default IP address
+            "price_stream": False,      # Stream Binance prices over a WebSocket instead of polling
+            "price_stream_url": ""      # Stream URL override (e.g. a local ws:// test server)
         }
         self.load_config()
 
@@ -102,6 +104,14 @@ class ConfigManager:
             # Return the current valid value
             return self.get_ip_address()
 
+    def get_price_stream(self):
+        """Whether Binance prices are streamed over a WebSocket"""
+        return bool(self.config.get("price_stream", self.defaults["price_stream"]))
+
+    def get_price_stream_url(self):
+        """The price stream URL, or an empty string for Binance's public stream"""
+        return self.config.get("price_stream_url", self.defaults["price_stream_url"])
+
     def get_transition_effect(self):
         """Get the current transition effect name"""
         # Import locally to avoid circular dependency if transitions need config
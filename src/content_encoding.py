@@ -0,0 +1,32 @@
+import io
+
+try:
+    import deflate
+except ImportError:
+    deflate = None  # Firmware built without the deflate module: never ask for compression
+
+# Value sent in Accept-Encoding, or None when responses cannot be decompressed
+ACCEPT_ENCODING = "gzip, deflate" if deflate is not None else None
+
+
+def supported(encoding: str) -> bool:
+    """
+    :param encoding: A Content-Encoding header value.
+    :return: True if a body with this encoding can be decoded.
+    """
+    return deflate is not None and encoding in ("gzip", "deflate")
+
+
+def open_decoder(encoding: str, stream):
+    """
+    Wrap a compressed body in a stream that yields the decompressed bytes
+    incrementally, so the decoded document never has to be held in RAM at once.
+    The decoder window is taken from the stream itself (at most 32 KB).
+    :param encoding: "gzip" or "deflate" (zlib-wrapped, per RFC 9110).
+    :param stream:   Blocking stream of the compressed body, or the complete body as bytes.
+    :return: A stream with read(size) and readinto(buf) methods.
+    """
+    if isinstance(stream, (bytes, bytearray)):
+        stream = io.BytesIO(stream)
+    fmt = deflate.GZIP if encoding == "gzip" else deflate.ZLIB
+    return deflate.DeflateIO(stream, fmt)
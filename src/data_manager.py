@@ -1,39 +1,198 @@
 import uasyncio as asyncio
-import urequests
+import heapq
 import time
 import json
 import os
+import ubinascii
+import content_encoding
 from pimoroni import RGBLED
+from http_client import HttpClient, parse_url
+from host_policy import HostPolicy, parse_retry_after
+from fetch_admission import FetchAdmission
+from memory_policy import default_policy
+from ram_cache import RamCache
+from cache_store import CacheStore
+from derived_metrics import DerivedMetrics
+from json_stream import JsonPathStream, split_path
+
+# Returned by _fetch_data when the server answered 304 Not Modified
+NOT_MODIFIED = object()
+
+# Logical data keys, and URLs known to serve identical data, mapped onto the
+# one URL that is actually fetched and cached
+DEFAULT_ALIASES = {
+    "tip_height": "https://mempool.space/api/blocks/tip/height",
+    "https://mempool.space/api/v1/blocks/tip/height": "https://mempool.space/api/blocks/tip/height",
+}
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL so trivially different spellings map to one cache entry:
+    lower-case scheme and host, no default port, sorted query parameters.
+    Keys that are not URLs (logical keys such as "tip_height") are returned unchanged.
+    """
+    if "://" not in url:
+        return url
+    scheme, rest = url.split("://", 1)
+    scheme = scheme.lower()
+    if "/" in rest:
+        host, path = rest.split("/", 1)
+        path = "/" + path
+    else:
+        host, path = rest, "/"
+    host = host.lower()
+    if (scheme == "https" and host.endswith(":443")) or (scheme == "http" and host.endswith(":80")):
+        host = host.rsplit(":", 1)[0]
+    if "?" in path:
+        path, query = path.split("?", 1)
+        path += "?" + "&".join(sorted(query.split("&")))
+    return scheme + "://" + host + path
+
+
+def _insert_path(tree, keys: list, value):
+    """
+    Insert `value` at `keys` into `tree`, creating dicts/lists along the way.
+    :return: The (possibly newly created) root.
+    """
+    key = keys[0]
+    if isinstance(key, int):
+        if not isinstance(tree, list):
+            tree = []
+        while len(tree) <= key:
+            tree.append(None)
+    elif not isinstance(tree, dict):
+        tree = {}
+
+    if len(keys) == 1:
+        tree[key] = value
+    else:
+        tree[key] = _insert_path(tree[key] if isinstance(key, int) else tree.get(key), keys[1:], value)
+    return tree
+
+
+def _assemble(results: dict):
+    """
+    Rebuild the original nesting from extracted path values, so code that reads
+    the full payload keeps working on the projection.
+    :param results: Dict mapping dotted paths to values.
+    :return: The projected payload, or None if nothing was found.
+    """
+    tree = None
+    for path, value in results.items():
+        tree = _insert_path(tree, split_path(path), value)
+    return tree
 
 
 class DataManager:
     """
     Manages periodic fetching and caching of data from registered endpoints.
-    Caches data to the local filesystem and handles optional LED indications.
+    Caches data in RAM and in a log-structured store on flash, and handles
+    optional LED indications.
     """
 
     def __init__(
         self,
         ttl_default: int = 60,
         cache_dir: str = "cache",
-        led=RGBLED(6, 7, 8)
+        led=RGBLED(6, 7, 8),
+        http_client=None,
+        ram_cache_bytes: int = 16 * 1024,
+        cache_quota_bytes: int = 32 * 1024,
+        write_interval: int = 300,
+        warm_dns: bool = True,
+        prefetch_lead: int = 10,
+        host_policy=None,
+        max_concurrent_fetches: int = 2,
+        fetch_memory_reserve: int = 16 * 1024,
+        memory_policy=None
     ) -> None:
         """
-        :param ttl_default: Default time-to-live (seconds) for all endpoints unless overridden.
-        :param cache_dir:   Directory where fetched data is cached.
-        :param led:         An optional RGBLED object to signal fetch states.
+        :param ttl_default:       Default time-to-live (seconds) for all endpoints unless overridden.
+        :param cache_dir:         Directory where fetched data is persisted across reboots.
+        :param led:               An optional RGBLED object to signal fetch states.
+        :param http_client:       Client used for fetching. Defaults to a non-blocking HttpClient.
+        :param ram_cache_bytes:   Byte budget of the in-memory cache that serves get_cached_data.
+        :param cache_quota_bytes: Maximum size of the on-flash cache log.
+        :param write_interval:    Minimum seconds between flash writes for one endpoint.
+                                  Newer data stays current in RAM in the meantime.
+        :param warm_dns:          Resolve the hosts of all registered endpoints when run() starts.
+        :param prefetch_lead:     Seconds before an applet is displayed that its data is fetched
+                                  when it is not needed earlier (see set_rotation).
+        :param host_policy:       Per-host rate limiting, backoff and circuit breaker.
+                                  Defaults to a HostPolicy with built-in limits.
+        :param max_concurrent_fetches: Fetches allowed in flight at once; the rest queue.
+        :param fetch_memory_reserve:   Free heap that must remain after a fetch's estimated
+                                       cost before it is started.
+        :param memory_policy:     Decides when the heap is collected. Defaults to the shared policy.
         """
         self.ttl_default = ttl_default
         self.cache_dir = cache_dir
         self.led = led
 
         self.endpoint_registry = {}
+        self._aliases = {}   # canonical alias or logical key -> physical URL
+        self._resolved = {}  # key as passed by applets -> physical URL
+        for alias, target in DEFAULT_ALIASES.items():
+            self.add_alias(alias, target)
+
+        # Values derived from cached data, recomputed only when the data changes
+        self.metrics = DerivedMetrics(self)
         self.retry_count = 3
         self.timeout = 10  # seconds
+        self.http_client = http_client or HttpClient(timeout=self.timeout)
+        self.warm_dns = warm_dns
+        self.prefetch_lead_ms = prefetch_lead * 1000
+        self.host_policy = host_policy or HostPolicy()
+        self.max_policy_wait_ms = 5000  # Longer waits reschedule the fetch instead of sleeping
+        self.stale_factor = 2  # Data older than this many TTLs is reported as stale
+        self.memory_policy = memory_policy or default_policy
+        # Fetches that come due together are admitted one by one as heap allows
+        self.admission = FetchAdmission(max_concurrent_fetches, fetch_memory_reserve, self.memory_policy)
 
         # Create the cache directory if it doesn't exist
         if not self._exists(self.cache_dir):
             self._mkdir(self.cache_dir)
+        self._remove_legacy_cache_files()
+
+        # Parsed data is served from RAM; the flash log is only read on a RAM miss
+        self.ram_cache = RamCache(ram_cache_bytes)
+        self.store = CacheStore(f"{self.cache_dir}/store.log", cache_quota_bytes)
+
+        # Flash write coalescing: changed data waits in _dirty until its endpoint's
+        # write interval has passed; unchanged data is never written
+        self.write_interval = write_interval
+        self._dirty = {}  # url -> metadata not yet persisted
+        self.write_stats = {
+            'written': 0,
+            'skipped_unchanged': 0,
+            'deferred': 0,
+            'failed': 0
+        }
+
+        # Fetch scheduler: min-heap of (due_ms, url) served by a single task
+        self._heap = []
+        self._in_flight = set()
+        self._wakeup = asyncio.Event()
+        # Set whenever cached data or its fetch time changes; the applet loop
+        # sleeps on it between frames
+        self.data_changed = asyncio.Event()
+        self._clock_ms = 0
+        self._last_ticks = time.ticks_ms()
+        self.scheduler_stats = {
+            'fetches': 0,
+            'not_modified': 0,
+            'total_lateness_ms': 0,
+            'max_lateness_ms': 0,
+            'shared_fetches_saved': 0,  # Fetches avoided because several keys share one URL
+            'rotation_deferred': 0,     # Fetches pushed past their TTL because nobody displays the data yet
+            'revalidations': 0          # Fetches pulled forward because expired data was read
+        }
+
+        # Display rotation published by AppletManager: endpoints are fetched just
+        # in time for the applets that show them rather than strictly every TTL
+        self._owner = None     # Applet whose register() is currently running
+        self._rotation = None  # (positions {owner: index}, current index, started_ms, duration_ms)
 
     def _exists(self, path: str) -> bool:
         """
@@ -74,151 +233,790 @@ class DataManager:
         else:
             self.led.set_rgb(0, 0, 0)
 
-    def _get_hash(self, url: str) -> str:
+    def _remove_legacy_cache_files(self) -> None:
+        """
+        Delete the per-URL-hash JSON files written by older firmware; the
+        cache now lives in a single log file.
+        """
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                try:
+                    os.remove(f"{self.cache_dir}/{name}")
+                except OSError as e:
+                    print(f"[DataManager] Could not remove legacy cache file {name}: {e}")
+
+    def _now_ms(self) -> int:
+        """
+        Monotonic milliseconds since start-up, immune to ticks_ms() wrap-around
+        and to NTP adjustments of the wall clock.
+        """
+        now = time.ticks_ms()
+        self._clock_ms += time.ticks_diff(now, self._last_ticks)
+        self._last_ticks = now
+        return self._clock_ms
+
+    def _schedule(self, url: str, due_ms: int) -> None:
+        """
+        (Re)schedule the next fetch of an endpoint and wake the scheduler.
+        Older heap entries for the same URL become stale and are skipped when popped.
+        :param url:    The endpoint URL.
+        :param due_ms: Deadline on the _now_ms() clock.
+        """
+        entry = self.endpoint_registry.get(url)
+        if entry is None:
+            return
+        entry['next_due'] = due_ms
+        heapq.heappush(self._heap, (due_ms, url))
+        self._wakeup.set()
+
+    def add_alias(self, alias: str, target: str) -> None:
+        """
+        Declare that `alias` (an equivalent URL or a logical key such as "tip_height")
+        serves the same data as `target`, so both share one fetch and one cache entry.
+        Must be called before either is registered.
+        :param alias:  The URL or logical key applets may use.
+        :param target: The URL that is actually fetched.
+        """
+        self._aliases[canonical_url(alias)] = self.resolve(target)
+        self._resolved = {}
+
+    def resolve(self, key: str) -> str:
+        """
+        Map a URL or logical key onto the physical URL that is fetched and cached.
+        """
+        url = self._resolved.get(key)
+        if url is None:
+            url = canonical_url(key)
+            url = self._aliases.get(url, url)
+            self._resolved[key] = url
+        return url
+
+    def register_owned(self, owner: str, register) -> None:
+        """
+        Run an applet's register() so that the endpoints it registers are
+        attributed to `owner`, which lets the scheduler follow the display rotation.
+        :param owner:    The applet name, as used in set_rotation().
+        :param register: Callable that registers the applet's endpoints.
+        """
+        self._owner = owner
+        self.metrics.owner = owner
+        try:
+            register()
+        finally:
+            self._owner = None
+            self.metrics.owner = None
+
+    def unregister_owner(self, owner: str) -> None:
+        """
+        Withdraw everything an applet registered through register_owned: its
+        endpoint registrations (endpoints nobody else uses stop being polled)
+        and the metrics only it defined.
+        :param owner: The applet name.
+        """
+        for entry in list(self.endpoint_registry.values()):
+            for entry_owner, key in list(entry['registrations']):
+                if entry_owner == owner:
+                    self.unregister_endpoint(key, owner)
+        self.metrics.forget_owner(owner)
+
+    def set_rotation(self, order, current_index: int, duration: int) -> None:
         """
-        Generate a short hash for the URL.
-        NOTE: This is not cryptographically secure and may collide with many endpoints.
-        :param url: The URL to hash.
-        :return: A short hash as a string.
+        Tell the scheduler which applet is on screen and what comes next.
+        Endpoints whose applets are shown later than their TTL are fetched
+        `prefetch_lead` seconds before they are displayed instead of every TTL;
+        endpoints of applets not in the rotation are not polled at all.
+        :param order:         Applet names in rotation order.
+        :param current_index: Index of the applet that has just started.
+        :param duration:      Seconds each applet stays on screen.
         """
-        # If possible, use a more robust function or a library like uhashlib
-        # For demonstration, we keep your approach
-        return str(sum(ord(c) for c in url) % 10000)
+        positions = {}
+        for index, name in enumerate(order):
+            positions.setdefault(name, index)
+        self._rotation = (positions, current_index, self._now_ms(), duration * 1000)
 
-    def _get_cache_file_path(self, url: str) -> str:
+        # Move pending deadlines to the new plan
+        for url, entry in self.endpoint_registry.items():
+            if entry['next_due'] is None or entry['fetched_ms'] is None:
+                continue  # In flight, or never fetched (already due now)
+            due_ms = self._plan_due(entry, entry['fetched_ms'] + entry['ttl'] * 1000)
+            if due_ms != entry['next_due']:
+                self._schedule(url, due_ms)
+
+    def _next_display_ms(self, entry):
         """
-        Generate the file path for the cached data, based on the URL hash.
-        :param url: The endpoint URL.
-        :return: The absolute filesystem path for the cache file.
+        :return: When the endpoint's data is next on screen on the _now_ms() clock
+                 (now if it is displayed), -1 if no applet in the rotation uses it,
+                 or None if that is unknown.
         """
-        file_name = f"{self._get_hash(url)}.json"
-        return f"{self.cache_dir}/{file_name}"
+        if self._rotation is None or not entry['owners']:
+            return None
+        positions, index, started_ms, duration_ms = self._rotation
+        count = len(positions)
+        if count == 0:
+            return -1
+        period_ms = count * duration_ms
+        now = self._now_ms()
+        best = -1
+        for owner in entry['owners']:
+            position = positions.get(owner)
+            if position is None:
+                continue
+            start_ms = started_ms + ((position - index) % count) * duration_ms
+            if start_ms <= now < start_ms + duration_ms:
+                return now
+            while start_ms < now:
+                start_ms += period_ms
+            if best < 0 or start_ms < best:
+                best = start_ms
+        return best
 
-    def register_endpoint(self, url, ttl=None):
+    def _plan_due(self, entry, ttl_due_ms: int) -> int:
+        """
+        Choose the next fetch deadline: at the TTL while the data is (about to be)
+        on screen, otherwise just before its applet is displayed next.
+        :param entry:      The endpoint's registry entry.
+        :param ttl_due_ms: When the cached data expires.
+        """
+        display_ms = self._next_display_ms(entry)
+        if display_ms is None:
+            return ttl_due_ms
+        if display_ms < 0:
+            # Not displayed at all: check back once the rotation could have changed
+            return max(ttl_due_ms, self._now_ms() + 3600 * 1000)
+        return max(ttl_due_ms, display_ms - self.prefetch_lead_ms)
+
+    def _reschedule(self, url: str, entry) -> None:
+        """
+        Schedule the next fetch after a successful one.
+        """
+        now = self._now_ms()
+        entry['fetched_ms'] = now
+        ttl_due_ms = now + entry['ttl'] * 1000
+        due_ms = self._plan_due(entry, ttl_due_ms)
+        if due_ms > ttl_due_ms:
+            self.scheduler_stats['rotation_deferred'] += 1
+        self._schedule(url, due_ms)
+
+    def register_endpoint(self, url, ttl=None, fields=None):
         """
         Register an endpoint to be polled with a specific TTL.
-        If the same endpoint is registered multiple times, the smallest TTL is used.
-        :param url: The endpoint URL to fetch from.
-        :param ttl: Time-to-live in seconds before a new fetch is forced.
+        If the same endpoint is registered multiple times, the smallest TTL is used
+        and the requested fields are merged.
+        Endpoints may be registered while the scheduler is running.
+        Equivalent URLs and aliases (see add_alias) share one registration.
+        :param url:    The endpoint URL (or logical key) to fetch from.
+        :param ttl:    Time-to-live in seconds before a new fetch is forced.
+        :param fields: Optional list of dotted JSON paths (e.g. "data.market_cap_percentage.btc").
+                       Only these values are parsed and stored; None keeps the whole response.
         """
         if ttl is None:
             ttl = self.ttl_default
+        if fields is not None:
+            fields = set(fields)
+        key = url
+        url = self.resolve(url)
 
         if url not in self.endpoint_registry:
             self.endpoint_registry[url] = {
+                'keys': {key},     # Names applets registered this endpoint under
+                'owners': {self._owner} if self._owner else set(),  # Applets showing this data
+                'registrations': {(self._owner, key)},  # (owner, key) pairs keeping it registered
+                'fetched_ms': None,  # _now_ms() of the last successful fetch
                 'ttl': ttl,
-                'last_update': 0  # Initialize last_update to 0 to force initial fetch
+                'fields': fields,
+                'last_update': 0,  # Wall-clock time of the last successful fetch
+                'next_due': None,
+                'lateness_ms': 0,  # How late the last fetch started against its deadline
+                'version': 0,      # Incremented whenever the fetched data changes
+                'data_hash': None,
+                'persisted_ms': None,
+                'etag': None,           # Validators for conditional GET
+                'last_modified': None,
+                'error': None      # Why the last fetch failed; cleared by the next success
             }
-        else:
-            # Use the minimum TTL if multiple registrations occur
-            if ttl < self.endpoint_registry[url]['ttl']:
-                self.endpoint_registry[url]['ttl'] = ttl
-            # Do not reset last_update if already registered, to respect existing cache state
-            # unless we specifically want to force re-fetch on re-registration logic.
-            # For now, assume existing last_update is fine.
+            # Fetch as soon as possible
+            self._schedule(url, self._now_ms())
+            return
+
+        entry = self.endpoint_registry[url]
+        entry['keys'].add(key)
+        entry['registrations'].add((self._owner, key))
+        if self._owner:
+            entry['owners'].add(self._owner)
+        known_fields = entry['fields']
+        if known_fields is not None and (fields is None or not fields.issubset(known_fields)):
+            # Someone needs data the cached projection lacks: widen it and refetch now,
+            # unconditionally, since a 304 would keep the narrower projection
+            entry['fields'] = None if fields is None else known_fields | fields
+            entry['etag'] = None
+            entry['last_modified'] = None
+            if entry['next_due'] is not None:
+                self._schedule(url, self._now_ms())
+
+        if ttl < entry['ttl']:
+            # Use the minimum TTL if multiple registrations occur, and pull the
+            # pending deadline forward to match the shorter TTL
+            entry['ttl'] = ttl
+            if entry['next_due'] is not None and entry['last_update']:
+                age_ms = int(time.time() - entry['last_update']) * 1000
+                due_ms = self._now_ms() + max(0, ttl * 1000 - age_ms)
+                if due_ms < entry['next_due']:
+                    self._schedule(url, due_ms)
+
+    def unregister_endpoint(self, url, owner=None) -> None:
+        """
+        Withdraw one registration of an endpoint. Aliases share the physical
+        endpoint, so it is only stopped, and its cached data evicted, when the
+        last registration under any key or owner is withdrawn.
+        :param url:   The endpoint URL (or logical key) as it was registered.
+        :param owner: The applet it was registered for (see register_owned), or None.
+        """
+        key = url
+        url = self.resolve(url)
+        entry = self.endpoint_registry.get(url)
+        if entry is None:
+            return
+        registrations = entry['registrations']
+        registrations.discard((owner, key))
+        if registrations:
+            entry['keys'] = {k for _, k in registrations}
+            entry['owners'] = {o for o, _ in registrations if o}
+            return
+
+        del self.endpoint_registry[url]
+        print(f"[DataManager] Unregistered endpoint {url}")
+        self.ram_cache.remove(url)
+        self.admission.forget(url)
+        self._dirty.pop(url, None)
+        self.store.delete(url)
 
     def get_cached_data(self, url):
         """
-        Retrieve cached data from the filesystem for a specific URL.
-        :param url: The URL whose cached data should be retrieved.
+        Retrieve cached data for a specific URL.
+        Data is served from the RAM cache; the flash log is only read on a RAM
+        miss (e.g. right after a reboot, or after the entry was evicted).
+        Expired data is still returned (stale-while-revalidate) and a refresh is
+        started in the background; see freshness() for how old it is.
+        :param url: The URL (or logical key) whose cached data should be retrieved.
         :return: Parsed JSON data if found, otherwise None.
         """
-        file_path = self._get_cache_file_path(url)
-        if self._exists(file_path):
-            with open(file_path, 'r') as f:
-                return json.load(f)
-        return None
+        url = self.resolve(url)
+        data = self.ram_cache.get(url)
+        if data is None:
+            data = self._dirty.get(url)
+            if data is None and url in self.store:
+                data, size = self.store.get_with_size(url)
+                self.ram_cache.put(url, data, size)
+        if data is not None:
+            self._revalidate(url, data)
+        return data
+
+    def _age(self, data) -> int:
+        """
+        :return: Seconds since the cache entry was fetched (0 while the clock is not set).
+        """
+        timestamp = data.get('timestamp') if isinstance(data, dict) else None
+        if not timestamp:
+            return 0
+        return max(0, int(time.time() - timestamp))
+
+    def _revalidate(self, url: str, data) -> None:
+        """
+        Pull the next fetch of an endpoint forward to now when its data is read
+        after it expired, e.g. because the fetch was deferred until the applet is
+        displayed or the device was offline. Skipped while a fetch is in flight,
+        after a failed fetch (its retry is already scheduled) and while the host
+        policy blocks the host.
+        """
+        entry = self.endpoint_registry.get(url)
+        if entry is None or entry['next_due'] is None or entry['error'] is not None:
+            return
+        if self._age(data) <= entry['ttl']:
+            return
+        now = self._now_ms()
+        if entry['next_due'] <= now or self.host_policy.delay_ms(parse_url(url)[1]) > 0:
+            return
+        self.scheduler_stats['revalidations'] += 1
+        self._schedule(url, now)
+
+    def freshness(self, url):
+        """
+        Describe how current the cached data of an endpoint is.
+        :param url: The URL (or logical key).
+        :return: {'fetched_at': wall-clock time of the cached data or None,
+                  'ttl': seconds, 'age': seconds, 'expired': older than the TTL,
+                  'stale': older than stale_factor TTLs, or expired after a failed fetch,
+                  'error': why the last fetch failed, or None},
+                 or None if the endpoint is not registered.
+        """
+        url = self.resolve(url)
+        entry = self.endpoint_registry.get(url)
+        if entry is None:
+            return None
+        data = self.get_cached_data(url)
+        ttl = entry['ttl']
+        age = self._age(data) if data is not None else 0
+        expired = data is not None and age > ttl
+        return {
+            'fetched_at': data.get('timestamp') if data is not None else None,
+            'ttl': ttl,
+            'age': age,
+            'expired': expired,
+            'stale': age > ttl * self.stale_factor or (expired and entry['error'] is not None),
+            'error': entry['error']
+        }
+
+    def is_stale(self, url) -> bool:
+        """
+        :return: True if the data shown for `url` should be flagged as out of date.
+        """
+        info = self.freshness(url)
+        return bool(info and info['stale'])
+
+    def prefetch(self, owner: str) -> None:
+        """
+        Load the cached data of every endpoint an applet uses into RAM and
+        compute its derived metrics, so showing the applet next needs neither
+        flash reads nor parsing.
+        :param owner: The applet name passed to register_owned().
+        """
+        for url, entry in self.endpoint_registry.items():
+            if owner in entry['owners']:
+                self.get_cached_data(url)
+                self.metrics.warm(url)
+
+    def get_data_version(self, url) -> int:
+        """
+        :return: A counter that changes whenever new data for `url` differs from the previous data.
+        """
+        entry = self.endpoint_registry.get(self.resolve(url))
+        return entry['version'] if entry else 0
+
+    def content_version(self, owner: str) -> tuple:
+        """
+        :param owner: The applet name passed to register_owned().
+        :return: A value that changes whenever anything the applet shows from its
+                 endpoints changes: the data, its fetch time or its staleness.
+        """
+        state = []
+        for url, entry in self.endpoint_registry.items():
+            if owner in entry['owners']:
+                state.append(entry['version'])
+                state.append(entry['last_update'])
+                state.append(self.is_stale(url))
+        return tuple(state)
+
+    def push_data(self, url, data: dict) -> bool:
+        """
+        Store data delivered by a push source (e.g. a WebSocket stream) as if it
+        had just been fetched. The endpoint's next poll moves a full TTL ahead,
+        so polling only resumes once the pushes stop.
+        :param url:  The URL (or logical key) the data stands in for.
+        :param data: A flat dict; it must hold every field registered for the
+                     endpoint and is projected onto them.
+        :return: False if the endpoint is not registered or the data cannot
+                 stand in for it (whole-response or nested fields).
+        """
+        url = self.resolve(url)
+        entry = self.endpoint_registry.get(url)
+        if entry is None or entry['fields'] is None:
+            return False
+        projected = {}
+        for field in entry['fields']:
+            if field not in data:
+                return False
+            projected[field] = data[field]
+
+        current_time = time.time()
+        entry['last_update'] = current_time
+        entry['error'] = None
+        self._store_data(url, {'data': projected, 'timestamp': current_time})
+        now = self._now_ms()
+        entry['fetched_ms'] = now
+        # Only move the deadline when it is getting close, so frequent pushes do
+        # not fill the heap with superseded entries
+        if entry['next_due'] is not None and entry['next_due'] - now < entry['ttl'] * 500:
+            self._reschedule(url, entry)
+        return True
+
+    def _store_data(self, url: str, metadata: dict) -> None:
+        """
+        Make freshly fetched data available in RAM and schedule it for flash.
+        Data identical to the previous fetch only refreshes the in-memory entry;
+        changed data is written at most once per write_interval per endpoint.
+        :param url:      The endpoint URL.
+        :param metadata: The cache entry ({'data': ..., 'timestamp': ...}).
+        """
+        serialized = json.dumps(metadata['data']).encode()
+        data_hash = ubinascii.crc32(serialized)
+        self.ram_cache.put(url, metadata, len(serialized))
+        self.admission.observe(url, len(serialized))
+        self.data_changed.set()
+
+        entry = self.endpoint_registry.get(url)
+        if entry is None:
+            return
+        if data_hash == entry['data_hash']:
+            self.write_stats['skipped_unchanged'] += 1
+            if url in self._dirty:
+                self._dirty[url] = metadata  # Keep the pending write's timestamp current
+            return
+
+        entry['data_hash'] = data_hash
+        entry['version'] += 1
+        self._dirty[url] = metadata
+        persisted_ms = entry['persisted_ms']
+        if persisted_ms is None or self._now_ms() - persisted_ms >= self.write_interval * 1000:
+            self._persist(url)
+        else:
+            self.write_stats['deferred'] += 1
+
+    def _persist(self, url: str) -> None:
+        """
+        Write an endpoint's pending data to the flash store.
+        """
+        metadata = self._dirty.pop(url, None)
+        if metadata is None:
+            return
+        entry = self.endpoint_registry.get(url)
+        try:
+            self.store.put(url, metadata)
+        except OSError as e:
+            # E.g. a full filesystem: the data stays current in RAM, retry after the write interval
+            print(f"[DataManager] Could not persist {url}: {e}")
+            self.write_stats['failed'] += 1
+            if entry is not None:
+                self._dirty.setdefault(url, metadata)
+                entry['persisted_ms'] = self._now_ms()
+            return
+        self.write_stats['written'] += 1
+        if entry is not None:
+            entry['persisted_ms'] = self._now_ms()
+
+    def _next_flush_ms(self):
+        """
+        :return: When the earliest deferred write becomes due, or None if nothing is pending.
+        """
+        due = None
+        for url in self._dirty:
+            entry = self.endpoint_registry.get(url)
+            persisted_ms = entry['persisted_ms'] if entry else None
+            url_due = 0 if persisted_ms is None else persisted_ms + self.write_interval * 1000
+            if due is None or url_due < due:
+                due = url_due
+        return due
+
+    def flush(self, force: bool = False) -> None:
+        """
+        Persist deferred writes whose write interval has passed.
+        :param force: Persist everything pending right away (e.g. before a reboot).
+        """
+        now = self._now_ms()
+        for url in list(self._dirty):
+            entry = self.endpoint_registry.get(url)
+            persisted_ms = entry['persisted_ms'] if entry else None
+            if force or persisted_ms is None or now - persisted_ms >= self.write_interval * 1000:
+                self._persist(url)
+
+    def _record_error(self, url: str, message: str) -> None:
+        """
+        Remember why fetching an endpoint failed, for freshness().
+        """
+        entry = self.endpoint_registry.get(url)
+        if entry is not None:
+            entry['error'] = message
+
+    async def _read_json(self, response, fields):
+        """
+        Parse a response body. With fields, the body is streamed through a
+        JsonPathStream so only the requested values are ever held in memory.
+        :param response: An HttpResponse whose body has not been read.
+        :param fields:   Dotted paths to keep, or None for the whole document.
+        :return: The parsed (and possibly projected) data.
+        """
+        if fields is None:
+            return await response.json()
+
+        parser = JsonPathStream(fields)
+        while not parser.done:
+            chunk = await response.read_chunk()
+            if not chunk:
+                break
+            parser.feed(chunk)
+        parser.close()
+        return _assemble(parser.results)
+
+    def _conditional_headers(self, url: str) -> dict:
+        """
+        Build If-None-Match / If-Modified-Since headers from the validators of the
+        last response. None are sent without cached data to fall back on.
+        """
+        entry = self.endpoint_registry.get(url)
+        headers = {}
+        if entry is None or self.get_cached_data(url) is None:
+            return headers
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
 
-    async def _fetch_data(self, url: str):
+    def _remember_validators(self, url: str, response) -> None:
         """
-        Fetch data from an API endpoint with a retry mechanism and exponential backoff.
-        :param url: The endpoint URL to fetch.
-        :return: The parsed JSON data if successful, otherwise None.
+        Store the ETag / Last-Modified of a 200 response for the next conditional GET.
+        """
+        entry = self.endpoint_registry.get(url)
+        if entry is not None:
+            entry['etag'] = response.headers.get('etag')
+            entry['last_modified'] = response.headers.get('last-modified')
+
+    async def _fetch_data(self, url: str, fields=None):
+        """
+        Fetch data from an API endpoint, retrying with jittered exponential backoff
+        within the limits of the per-host policy (rate limit, Retry-After, circuit breaker).
+        The request runs on the event loop without blocking it; cancelling the calling
+        task aborts the request and closes its socket. Requests are conditional when
+        the endpoint returned validators before.
+        :param url:    The endpoint URL to fetch.
+        :param fields: Optional dotted paths; only these values are parsed and returned.
+        :return: The parsed JSON data if successful, NOT_MODIFIED on a 304, otherwise None.
         """
         print(f"[DataManager] Fetching data from {url}")
-        response = None
-        for attempt in range(self.retry_count):
-            try:
-                self._set_led("getting_data")
-                response = urequests.get(url, timeout=self.timeout)
-                if response.status_code == 200:
-                    data = response.json()
-                    self._set_led("success")
-                    print(f"[DataManager] Successfully fetched data from: {url}") # Less verbose log
-                    return data
-                else:
-                    print(f"[DataManager] HTTP Error: {response.status_code}")
+        headers = self._conditional_headers(url)
+        host = parse_url(url)[1]
+        policy = self.host_policy
+        # The host policy is told about at most one failure per call, after the
+        # retries: a single failed cycle (e.g. a brief Wi-Fi drop) must not count
+        # as repeated failures. Reporting it is also what ends a half-open probe.
+        failed = False
+        try:
+            for attempt in range(self.retry_count):
+                # Respect the host's rate limit, Retry-After and circuit breaker
+                wait_ms = policy.acquire(host)
+                if 0 < wait_ms <= self.max_policy_wait_ms:
+                    await asyncio.sleep_ms(wait_ms)
+                    wait_ms = policy.acquire(host)
+                if wait_ms > 0:
+                    print(f"[DataManager] {host} not available for {wait_ms // 1000} s, postponing {url}")
+                    self._record_error(url, f"{host} unavailable")
+                    return None
+
+                response = None
+                backoff = False
+                settled = False  # Whether the outcome of this attempt is known
+                try:
+                    self._set_led("getting_data")
+                    response = await self.http_client.get(url, headers=headers, timeout=self.timeout)
+                    if response.status == 304:
+                        policy.record_success(host)
+                        failed = False
+                        settled = True
+                        self._set_led("success")
+                        print(f"[DataManager] Not modified: {url}")
+                        return NOT_MODIFIED
+                    if response.status == 200:
+                        self._remember_validators(url, response)
+                        encoding = response.headers.get("content-encoding", "").strip().lower()
+                        self.admission.observe_encoding(url, content_encoding.supported(encoding))
+                        data = await self._read_json(response, fields)
+                        policy.record_success(host)
+                        failed = False
+                        settled = True
+                        self._set_led("success")
+                        print(f"[DataManager] Successfully fetched data from: {url}") # Less verbose log
+                        return data
+
+                    print(f"[DataManager] HTTP Error: {response.status}")
+                    self._set_led("error")
+                    self._record_error(url, f"HTTP {response.status}")
+                    if response.status == 429 or response.status >= 500:
+                        retry_after = parse_retry_after(response.headers.get("retry-after"))
+                        settled = True
+                        if response.status == 429 or retry_after is not None:
+                            policy.record_failure(host, retry_after)
+                            failed = False
+                            return None  # Rescheduled once the host allows it
+                        failed = True
+                        backoff = True
+                    else:
+                        # The host is up but rejects the request; retrying will not help
+                        policy.record_success(host)
+                        failed = False
+                        settled = True
+                        return None
+                except (OSError, asyncio.TimeoutError) as e:
+                    print(f"[DataManager] Network error (attempt {attempt + 1}/{self.retry_count}): {e}")
+                    self._set_led("error")
+                    self._record_error(url, f"Network error: {e}")
+                    failed = True
+                    settled = True
+                    backoff = True
+                except ValueError as e:
+                    print(f"[DataManager] JSON parsing error: {e}")
                     self._set_led("error")
-            except OSError as e:
-                print(f"[DataManager] Network error (attempt {attempt + 1}/{self.retry_count}): {e}")
-                self._set_led("error")
-                # Exponential backoff before the next attempt
-                await asyncio.sleep(2 ** attempt)
-            except ValueError as e:
-                print(f"[DataManager] JSON parsing error: {e}")
-                self._set_led("error")
-                return None
-            except Exception as e:
-                print(f"[DataManager] Unexpected error: {e}")
-                self._set_led("error")
-                return None
-            finally:
-                # Ensure response is closed to free resources
-                if response is not None:
-                    response.close()
-                self._set_led("off")
-
-        print(f"[DataManager] Failed to fetch data from {url} after {self.retry_count} attempts.")
-        return None
-
-    async def _update_cache(self, url: str) -> None:
-        """
-        Periodically update the cache for a specific endpoint.
-        :param url: The endpoint URL to keep updated.
+                    self._record_error(url, "Invalid JSON")
+                    return None
+                except Exception as e:
+                    print(f"[DataManager] Unexpected error: {e}")
+                    self._set_led("error")
+                    self._record_error(url, f"Error: {e}")
+                    return None
+                finally:
+                    # Invalid JSON, unexpected errors and cancellation count as failures too
+                    if not settled:
+                        failed = True
+                    # Ensure response is closed to free resources
+                    if response is not None:
+                        await response.close()
+                    self._set_led("off")
+
+                if backoff and attempt + 1 < self.retry_count:
+                    # Exponential backoff with jitter before the next attempt
+                    await asyncio.sleep_ms(policy.backoff_ms(attempt))
+
+            print(f"[DataManager] Failed to fetch data from {url} after {self.retry_count} attempts.")
+            return None
+        finally:
+            if failed:
+                policy.record_failure(host)
+
+    def _touch(self, url: str) -> None:
         """
-        while True:
-            current_time = time.time()
-            file_path = self._get_cache_file_path(url)
-            ttl = self.endpoint_registry[url]['ttl']
-            last_update = self.endpoint_registry[url]['last_update']
-
-            # Check if the TTL has expired OR if it's the very first run (last_update == 0)
-            if last_update == 0 or (current_time - last_update > ttl):
-                data = await self._fetch_data(url)
-                if data is not None:
-                    # Update last_update only after a successful fetch and write
-                    new_timestamp = time.time() # Use fresh timestamp for successful update
-                    self.endpoint_registry[url]['last_update'] = new_timestamp
-                    metadata = {
-                        'data': data,
-                        'timestamp': current_time
-                    }
-                    with open(file_path, 'w') as f:
-                        json.dump(metadata, f)
-
-            # Sleep for half the TTL to allow for more frequent checks
-            # while still respecting the TTL for fresh data
-            # For initial fetch (last_update was 0), a shorter sleep might be better if fetch failed.
-            # However, _fetch_data has retries. If it returns None, it means all retries failed.
-            sleep_duration = ttl // 2
-            if last_update == 0 and data is None: # If initial fetch for this URL failed in this cycle
-                sleep_duration = min(60, ttl // 2 if ttl // 2 > 0 else 60) # Retry sooner, ensure positive sleep
-
-            await asyncio.sleep(sleep_duration)
+        Mark cached data as freshly validated (after a 304) without parsing or writing it.
+        """
+        current_time = time.time()
+        self.endpoint_registry[url]['last_update'] = current_time
+        self.scheduler_stats['not_modified'] += 1
+        self.data_changed.set()
+        cached = self.get_cached_data(url)
+        if cached is not None:
+            metadata = {
+                'data': cached['data'],
+                'timestamp': current_time
+            }
+            if not self.ram_cache.replace(url, metadata):
+                self.ram_cache.put(url, metadata, len(json.dumps(cached['data'])))
+            if url in self._dirty:
+                self._dirty[url] = metadata
+
+    async def _refresh(self, url: str, due_ms: int) -> None:
+        """
+        Fetch one endpoint, store the result and schedule its next fetch.
+        :param url:    The endpoint URL.
+        :param due_ms: The deadline this fetch was scheduled for.
+        """
+        lateness_ms = max(0, self._now_ms() - due_ms)
+        stats = self.scheduler_stats
+        stats['fetches'] += 1
+        stats['total_lateness_ms'] += lateness_ms
+        if lateness_ms > stats['max_lateness_ms']:
+            stats['max_lateness_ms'] = lateness_ms
+        entry = self.endpoint_registry.get(url)
+        if entry is not None:
+            entry['lateness_ms'] = lateness_ms
+            stats['shared_fetches_saved'] += len(entry['keys']) - 1
+        if lateness_ms >= 1000:
+            print(f"[DataManager] Fetch for {url} started {lateness_ms} ms after its deadline")
+
+        await self.admission.acquire(url)
+        try:
+            entry = self.endpoint_registry.get(url)
+            fields = entry['fields'] if entry else None
+            data = await self._fetch_data(url, fields)
+        finally:
+            self.admission.release(url)
+            self._in_flight.discard(url)
+            # Response buffers, TLS state and parse temporaries are garbage now
+            self.memory_policy.collect("fetch")
+
+        entry = self.endpoint_registry.get(url)
+        if entry is None:
+            return  # Unregistered while the fetch was running
+
+        ttl = entry['ttl']
+        if data is not None and entry['fields'] != fields:
+            # register_endpoint() widened the projection while this fetch ran. The
+            # result and its validators only cover the old fields: discard both and
+            # refetch now, unconditionally, so a 304 cannot keep the narrow data
+            print(f"[DataManager] Fields of {url} changed during the fetch, refetching")
+            entry['etag'] = None
+            entry['last_modified'] = None
+            self._schedule(url, self._now_ms())
+            return
+
+        try:
+            if data is NOT_MODIFIED:
+                entry['error'] = None
+                self._touch(url)
+                self._reschedule(url, entry)
+                return
+            if data is not None:
+                entry['error'] = None
+                current_time = time.time()
+                entry['last_update'] = current_time
+                metadata = {
+                    'data': data,
+                    'timestamp': current_time
+                }
+                self._store_data(url, metadata)
+                self._reschedule(url, entry)
+                return
+        except Exception as e:
+            # E.g. OSError from a full filesystem. The endpoint must stay in the
+            # schedule, or it would never be polled again.
+            print(f"[DataManager] Could not store data for {url}: {e}")
+            self._record_error(url, f"Store error: {e}")
+
+        # All retries (or storing the result) failed: try again sooner than a full TTL
+        retry_in = min(60, ttl // 2 if ttl // 2 > 0 else 60)
+        # ...but not before the host's policy (Retry-After, open circuit) allows it
+        retry_ms = max(retry_in * 1000, self.host_policy.delay_ms(parse_url(url)[1]))
+        self._schedule(url, self._now_ms() + retry_ms)
 
     async def run(self) -> None:
         """
-        Start polling all registered endpoints concurrently.
+        Run the fetch scheduler. A single task sleeps until the earliest deadline in
+        the heap, starts every fetch that is due, persists deferred flash writes,
+        and goes back to sleep. Registering an endpoint wakes it early.
         This method should be scheduled as a background task, e.g.:
             asyncio.create_task(data_manager.run())
         """
         print("[DataManager] Starting data manager")
-        tasks = [
-            asyncio.create_task(self._update_cache(url))
-            for url in self.endpoint_registry
-        ]
-        if not tasks:
-            print("[DataManager] No endpoints registered. DataManager run loop will be idle.")
+        if not self.endpoint_registry:
+            print("[DataManager] No endpoints registered yet. Scheduler will wait for registrations.")
         else:
-            print(f"[DataManager] Starting _update_cache tasks for URLs: {list(self.endpoint_registry.keys())}")
-        await asyncio.gather(*tasks)
+            print(f"[DataManager] Scheduling URLs: {list(self.endpoint_registry.keys())}")
+            keys = sum(len(entry['keys']) for entry in self.endpoint_registry.values())
+            if keys > len(self.endpoint_registry):
+                print(f"[DataManager] {keys} registrations share {len(self.endpoint_registry)} physical endpoints")
+            # Drop data cached for endpoints no applet uses any more
+            self.store.retain(self.endpoint_registry)
+            if self.warm_dns:
+                self.http_client.warm_dns(self.endpoint_registry)
+                print(f"[DataManager] DNS cache warmed: {self.http_client.dns_cache.stats()}")
+
+        while True:
+            self._wakeup.clear()
+            now = self._now_ms()
+            if self._dirty:
+                self.flush()
+            while self._heap and self._heap[0][0] <= now:
+                due_ms, url = heapq.heappop(self._heap)
+                entry = self.endpoint_registry.get(url)
+                if entry is None or entry['next_due'] != due_ms or url in self._in_flight:
+                    continue  # Stale heap entry
+                entry['next_due'] = None
+                self._in_flight.add(url)
+                asyncio.create_task(self._refresh(url, due_ms))
+
+            wake_at = self._heap[0][0] if self._heap else None
+            flush_at = self._next_flush_ms()
+            if flush_at is not None and (wake_at is None or flush_at < wake_at):
+                wake_at = flush_at
+            try:
+                if wake_at is not None:
+                    await asyncio.wait_for_ms(self._wakeup.wait(), max(0, wake_at - now))
+                else:
+                    await self._wakeup.wait()
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,128 @@
+class DerivedMetrics:
+    """
+    Values computed from cached endpoint data, e.g. a float price parsed from a
+    Binance ticker or sats per dollar. Each metric is recomputed only when the
+    data version of its source endpoint changes, so applets can read it on
+    every frame for the cost of a dict lookup.
+
+    Usage:
+        metrics.define("btc_usd_price", url, last_price)
+        price = metrics.get("btc_usd_price")
+    """
+
+    def __init__(self, data_manager) -> None:
+        """
+        :param data_manager: The DataManager whose cached data metrics are computed from.
+        """
+        self.data_manager = data_manager
+        self._metrics = {}  # name -> [source url, func, source version, value, owners]
+        self.owner = None   # Applet whose register() is running, set by DataManager.register_owned
+        self.computations = 0
+        self.hits = 0
+
+    def define(self, name: str, url: str, func) -> None:
+        """
+        Declare a metric. Redefining a name with the same function is a no-op, so
+        several applets may declare the metrics they share.
+        :param name: Metric name.
+        :param url:  Endpoint URL (or logical key) the metric is computed from.
+        :param func: Called with the endpoint's payload; returns the value or None.
+                     ValueError, TypeError, KeyError, IndexError and
+                     ZeroDivisionError are treated as "no value".
+        """
+        metric = self._metrics.get(name)
+        if metric is not None:
+            metric[4].add(self.owner)
+            if metric[1] is func:
+                return
+        owners = metric[4] if metric is not None else {self.owner}
+        self._metrics[name] = [url, func, None, None, owners]
+
+    def forget_owner(self, owner: str) -> None:
+        """
+        Drop the metrics only `owner` defined. Their functions may be bound
+        methods, which would otherwise keep the applet instance alive.
+        """
+        for name in list(self._metrics):
+            owners = self._metrics[name][4]
+            owners.discard(owner)
+            if not owners:
+                del self._metrics[name]
+
+    def warm(self, url: str) -> None:
+        """
+        Bring every metric computed from `url` up to date ahead of its first get().
+        :param url: Physical endpoint URL (as resolved by the DataManager).
+        """
+        for name, metric in self._metrics.items():
+            if self.data_manager.resolve(metric[0]) == url:
+                self.get(name)
+
+    def invalidate(self, name: str) -> None:
+        """
+        Force a recomputation on the next get(), e.g. when a metric depends on
+        state outside the cached data.
+        """
+        metric = self._metrics.get(name)
+        if metric is not None:
+            metric[2] = None
+
+    def get(self, name: str, default=None):
+        """
+        :return: The metric's current value, or `default` if it is unknown or has no value.
+        """
+        metric = self._metrics.get(name)
+        if metric is None:
+            return default
+
+        version = self.data_manager.get_data_version(metric[0])
+        if version == metric[2]:
+            self.hits += 1
+        else:
+            value = None
+            cached = self.data_manager.get_cached_data(metric[0])
+            payload = cached.get('data') if isinstance(cached, dict) else None
+            if payload is not None:
+                try:
+                    value = metric[1](payload)
+                except (ValueError, TypeError, KeyError, IndexError, ZeroDivisionError) as e:
+                    print(f"[DerivedMetrics] Could not compute {name}: {e}")
+            # Only remember the version once data exists, so data loaded later is picked up
+            metric[2] = version if payload is not None else None
+            metric[3] = value
+            self.computations += 1
+
+        value = metric[3]
+        return default if value is None else value
+
+    def stats(self) -> dict:
+        """
+        :return: Number of metrics and how often they were recomputed vs served from memory.
+        """
+        return {
+            "metrics": len(self._metrics),
+            "computations": self.computations,
+            "hits": self.hits,
+        }
+
+
+def last_price(data) -> float:
+    """
+    Price from a Binance 24h ticker.
+    """
+    return float(data['lastPrice'])
+
+
+def price_change_percent(data) -> float:
+    """
+    24h change in percent from a Binance 24h ticker.
+    """
+    return float(data['priceChangePercent'])
+
+
+def sats_per_unit(data):
+    """
+    Satoshis per unit of the quote currency ("Moscow time" for USD) from a Binance 24h ticker.
+    """
+    price = last_price(data)
+    return int(100_000_000 / price) if price > 0 else None
@@ -0,0 +1,211 @@
+class DamageTracker:
+    """
+    Tracks which parts of the framebuffer changed since the last push to the
+    panel. The screen is divided into tiles; every draw operation folds a hash
+    of itself (operation, arguments, pen, font, clip) into each tile it covers,
+    and a full-screen clear resets all tiles. A tile whose hash differs from
+    the one it had at the last push has new pixels.
+
+    Applets clear and redraw the whole frame, so a frame that repeats the
+    previous one except for a single value only damages the tiles under that
+    value. Memory use is one small int per tile, independent of the number of
+    draw operations.
+    """
+
+    HASH_MASK = 0xFFFFFF  # Keep tile hashes small ints (no heap allocation on MicroPython)
+
+    def __init__(self, width: int, height: int, tile: int = 16) -> None:
+        """
+        :param width:  Screen width in pixels.
+        :param height: Screen height in pixels.
+        :param tile:   Tile edge length in pixels; smaller tiles give tighter regions.
+        """
+        self.width = width
+        self.height = height
+        self.tile = tile
+        self.cols = (width + tile - 1) // tile
+        self.rows = (height + tile - 1) // tile
+        self._tiles = [0] * (self.cols * self.rows)
+        self._pushed = None  # Tile hashes as last pushed, None until the first push
+
+    def reset(self, op_hash: int) -> None:
+        """
+        Record a full-screen clear: every tile now only depends on it.
+        """
+        op_hash &= self.HASH_MASK
+        tiles = self._tiles
+        for i in range(len(tiles)):
+            tiles[i] = op_hash
+
+    def add(self, op_hash: int, x: int, y: int, w: int, h: int) -> None:
+        """
+        Record a draw operation whose pixels lie within the given rectangle.
+        """
+        x0 = max(0, x)
+        y0 = max(0, y)
+        x1 = min(self.width, x + w)
+        y1 = min(self.height, y + h)
+        if x0 >= x1 or y0 >= y1:
+            return
+        op_hash &= self.HASH_MASK
+        tile = self.tile
+        cols = self.cols
+        tiles = self._tiles
+        for row in range(y0 // tile, (y1 - 1) // tile + 1):
+            base = row * cols
+            for col in range(x0 // tile, (x1 - 1) // tile + 1):
+                i = base + col
+                tiles[i] = ((tiles[i] * 31) ^ op_hash) & self.HASH_MASK
+
+    def invalidate(self) -> None:
+        """
+        Forget what the panel shows, e.g. after drawing the tracker did not see.
+        """
+        self._pushed = None
+
+    def damaged(self):
+        """
+        :return: (x, y, w, h) bounding the changed tiles, (0, 0, width, height)
+                 if the panel state is unknown, or None if nothing changed.
+        """
+        pushed = self._pushed
+        if pushed is None:
+            return (0, 0, self.width, self.height)
+        tiles = self._tiles
+        cols = self.cols
+        min_col = min_row = None
+        max_col = max_row = 0
+        for i in range(len(tiles)):
+            if tiles[i] != pushed[i]:
+                row, col = divmod(i, cols)
+                if min_row is None:
+                    min_row = row
+                    min_col = col
+                elif col < min_col:
+                    min_col = col
+                if col > max_col:
+                    max_col = col
+                max_row = row
+        if min_row is None:
+            return None
+        tile = self.tile
+        x = min_col * tile
+        y = min_row * tile
+        return (x, y, min(self.width, (max_col + 1) * tile) - x, min(self.height, (max_row + 1) * tile) - y)
+
+    def pushed(self) -> None:
+        """
+        Mark the current framebuffer as shown on the panel.
+        """
+        self._pushed = list(self._tiles)
+
+
+class TrackedDisplay:
+    """
+    Wraps a PicoGraphics instance and reports the area of every drawing call
+    to a DamageTracker. Everything else is passed through unchanged. Drawing
+    through calls not listed here (or directly on the wrapped display) must be
+    followed by ScreenManager.invalidate().
+    """
+
+    # Cell height of the bitmap fonts at scale 1, including descenders
+    FONT_HEIGHTS = {"bitmap6": 8, "bitmap8": 8, "bitmap14_outline": 14}
+
+    def __init__(self, display, tracker: DamageTracker, on_update) -> None:
+        """
+        :param display:   The PicoGraphics instance.
+        :param tracker:   Receives the area of each draw operation.
+        :param on_update: Called instead of display.update(), so pushes go
+                          through the damage logic.
+        """
+        self._display = display
+        self._tracker = tracker
+        self._on_update = on_update
+        self._pen = None
+        self._font = None
+        self._clip = None
+
+    def __getattr__(self, name):
+        return getattr(self._display, name)
+
+    def _add(self, key: tuple, x: int, y: int, w: int, h: int) -> None:
+        clip = self._clip
+        if clip is not None:
+            cx, cy, cw, ch = clip
+            x1 = min(x + w, cx + cw)
+            y1 = min(y + h, cy + ch)
+            x = max(x, cx)
+            y = max(y, cy)
+            w = x1 - x
+            h = y1 - y
+        self._tracker.add(hash((key, self._pen, self._font, clip)), x, y, w, h)
+
+    def set_pen(self, pen):
+        self._pen = pen
+        return self._display.set_pen(pen)
+
+    def set_font(self, font):
+        self._font = font
+        return self._display.set_font(font)
+
+    def set_clip(self, x, y, w, h):
+        self._clip = (x, y, w, h)
+        return self._display.set_clip(x, y, w, h)
+
+    def remove_clip(self):
+        self._clip = None
+        return self._display.remove_clip()
+
+    def clear(self):
+        if self._clip is None:
+            self._tracker.reset(hash(("clear", self._pen)))
+        else:
+            self._add(("clear",), 0, 0, self._tracker.width, self._tracker.height)
+        return self._display.clear()
+
+    def update(self):
+        self._on_update()
+
+    def text(self, text, x, y, wordwrap=None, scale=2, angle=0, spacing=1):
+        if wordwrap is not None or angle or "\n" in text:
+            # Wrapped or rotated text is hard to bound: assume everything below and to the right
+            w = self._tracker.width - x
+            h = self._tracker.height - y
+        else:
+            w = self._display.measure_text(text, scale=scale, spacing=spacing) + scale
+            h = self.FONT_HEIGHTS.get(self._font, 16) * scale
+        self._add(("text", text, x, y, wordwrap, scale, angle, spacing), x, y, w, h)
+        if wordwrap is None:
+            return self._display.text(text, x, y, scale=scale, angle=angle, spacing=spacing)
+        return self._display.text(text, x, y, wordwrap, scale, angle, spacing)
+
+    def rectangle(self, x, y, w, h):
+        self._add(("rectangle", x, y, w, h), x, y, w, h)
+        return self._display.rectangle(x, y, w, h)
+
+    def line(self, x1, y1, x2, y2, *args):
+        thickness = args[0] if args else 1
+        x = min(x1, x2) - thickness
+        y = min(y1, y2) - thickness
+        self._add(("line", x1, y1, x2, y2) + args, x, y,
+                  abs(x2 - x1) + 2 * thickness + 1, abs(y2 - y1) + 2 * thickness + 1)
+        return self._display.line(x1, y1, x2, y2, *args)
+
+    def triangle(self, x1, y1, x2, y2, x3, y3):
+        x = min(x1, x2, x3)
+        y = min(y1, y2, y3)
+        self._add(("triangle", x1, y1, x2, y2, x3, y3), x, y,
+                  max(x1, x2, x3) - x + 1, max(y1, y2, y3) - y + 1)
+        return self._display.triangle(x1, y1, x2, y2, x3, y3)
+
+    def circle(self, x, y, r):
+        self._add(("circle", x, y, r), x - r, y - r, 2 * r + 1, 2 * r + 1)
+        return self._display.circle(x, y, r)
+
+    def pixel(self, x, y):
+        self._add(("pixel", x, y), x, y, 1, 1)
+        return self._display.pixel(x, y)
+
+    def pixel_span(self, x, y, length):
+        self._add(("pixel_span", x, y, length), x, y, length, 1)
+        return self._display.pixel_span(x, y, length)
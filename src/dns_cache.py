@@ -0,0 +1,97 @@
+import socket
+import time
+
+
+class DnsCache:
+    """
+    Caches getaddrinfo() results so each request does not pay a DNS round trip.
+    MicroPython does not expose record TTLs, so every answer lives for a fixed
+    `ttl`. Failed lookups are cached for `negative_ttl` to avoid hammering the
+    resolver, and when a refresh fails an expired answer is still served for up
+    to `max_stale` seconds (hosts rarely move, the network often blips).
+    """
+
+    def __init__(self, ttl: int = 600, negative_ttl: int = 30, max_stale: int = 24 * 3600) -> None:
+        """
+        :param ttl:          Seconds a successful lookup is considered fresh.
+        :param negative_ttl: Seconds a failed lookup is remembered.
+        :param max_stale:    Seconds past expiry an old answer may still be used when DNS fails.
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_stale = max_stale
+        self._entries = {}  # (host, port) -> [addrinfo or None, expires_ms, resolved_ms]
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.stale_hits = 0
+        self.failures = 0
+
+    def resolve(self, host: str, port: int):
+        """
+        Resolve host:port, using the cache when possible.
+        :return: A single getaddrinfo() tuple (family, type, proto, canonname, sockaddr).
+        :raises OSError: If the host cannot be resolved and no usable answer is cached.
+        """
+        key = (host, port)
+        now = time.ticks_ms()
+        entry = self._entries.get(key)
+        if entry is not None and time.ticks_diff(entry[1], now) > 0:
+            if entry[0] is None:
+                self.negative_hits += 1
+                raise OSError("DNS lookup for %s failed recently" % host)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        try:
+            addrinfo = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0]
+        except (OSError, IndexError) as e:
+            self.failures += 1
+            if entry is not None and entry[0] is not None \
+                    and time.ticks_diff(now, entry[2]) < (self.ttl + self.max_stale) * 1000:
+                self.stale_hits += 1
+                print(f"[DnsCache] Lookup for {host} failed ({e}), using stale address")
+                # Back off like a negative entry, but keep the original resolve time
+                entry[1] = time.ticks_add(now, self.negative_ttl * 1000)
+                return entry[0]
+            print(f"[DnsCache] Lookup for {host} failed: {e}")
+            self._entries[key] = [None, time.ticks_add(now, self.negative_ttl * 1000), now]
+            raise OSError("DNS lookup for %s failed" % host)
+
+        self._entries[key] = [addrinfo, time.ticks_add(now, self.ttl * 1000), now]
+        return addrinfo
+
+    def resolve_ip(self, host: str, port: int) -> str:
+        """
+        :return: The numeric address of host as a string.
+        """
+        return self.resolve(host, port)[-1][0]
+
+    def warm(self, hosts) -> None:
+        """
+        Resolve a set of hosts up front, e.g. at boot. Failures are logged and ignored.
+        :param hosts: Iterable of (host, port) tuples.
+        """
+        for host, port in hosts:
+            try:
+                self.resolve(host, port)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        """
+        :return: Cache size and hit/miss counters.
+        """
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "stale_hits": self.stale_hits,
+            "failures": self.failures,
+        }
+
+
+# Shared by HttpClient and urlopen so both benefit from each other's lookups
+default_cache = DnsCache()
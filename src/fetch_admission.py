@@ -0,0 +1,117 @@
+import uasyncio as asyncio
+import gc
+import content_encoding
+from memory_policy import default_policy
+
+
+class FetchAdmission:
+    """
+    Admission control for concurrent fetches. A fetch starts only while fewer
+    than `max_concurrent` are running and gc.mem_free() covers its estimated
+    cost plus a reserve for the rest of the application; otherwise it waits in
+    a FIFO queue. Costs start from a per-scheme base (a TLS session is by far
+    the largest allocation) and learn each endpoint's parsed data size and
+    whether it answers compressed (the inflate window is as large as a TLS session).
+    """
+
+    TLS_COST = 32 * 1024   # mbedTLS handshake and record buffers
+    PLAIN_COST = 4 * 1024  # Socket and header buffers
+    DEFLATE_COST = 34 * 1024  # 32 KB inflate window plus buffered compressed input
+    POLL_MS = 1000         # How often a queued fetch re-checks free memory
+
+    def __init__(self, max_concurrent: int = 2, reserve_bytes: int = 16 * 1024, memory_policy=None) -> None:
+        """
+        :param max_concurrent: Maximum number of fetches in flight.
+        :param reserve_bytes:  Free heap that must remain after a fetch's estimated cost.
+        :param memory_policy:  Runs the collection that precedes a memory wait.
+        """
+        self.max_concurrent = max_concurrent
+        self.reserve_bytes = reserve_bytes
+        self.memory_policy = memory_policy or default_policy
+        self.active = 0
+        self._queue = []         # URLs waiting, in arrival order
+        self._data_sizes = {}    # url -> serialized size of its last data
+        self._encoded = {}       # url -> whether its last response was compressed
+        self._changed = asyncio.Event()
+        self.stats = {
+            'admitted': 0,
+            'queued': 0,
+            'memory_waits': 0,
+            'forced': 0
+        }
+
+    def estimate(self, url: str) -> int:
+        """
+        :return: Estimated peak heap use of fetching `url`, in bytes.
+        """
+        base = self.TLS_COST if url.startswith("https:") else self.PLAIN_COST
+        # Until an endpoint has answered, assume it compresses whenever we ask for it
+        if self._encoded.get(url, content_encoding.ACCEPT_ENCODING is not None):
+            base += self.DEFLATE_COST
+        # Parsing roughly doubles the size of the resulting objects
+        return base + 2 * self._data_sizes.get(url, 1024)
+
+    def observe(self, url: str, data_size: int) -> None:
+        """
+        Record the serialized size of an endpoint's data for future estimates.
+        """
+        self._data_sizes[url] = data_size
+
+    def observe_encoding(self, url: str, encoded: bool) -> None:
+        """
+        Record whether an endpoint's last response body was compressed.
+        """
+        self._encoded[url] = encoded
+
+    def forget(self, url: str) -> None:
+        self._data_sizes.pop(url, None)
+        self._encoded.pop(url, None)
+
+    def _fits(self, url: str) -> bool:
+        needed = self.estimate(url) + self.reserve_bytes
+        if gc.mem_free() >= needed:
+            return True
+        self.memory_policy.collect("admission")
+        return gc.mem_free() >= needed
+
+    async def acquire(self, url: str) -> None:
+        """
+        Wait until `url` may be fetched. Must be paired with release().
+        """
+        self._queue.append(url)
+        waited = False
+        try:
+            while True:
+                if self._queue[0] == url and self.active < self.max_concurrent:
+                    if self._fits(url):
+                        break
+                    if self.active == 0:
+                        # Nothing in flight will free memory for us: go ahead anyway
+                        print(f"[FetchAdmission] Low memory ({gc.mem_free()} bytes free), fetching {url} anyway")
+                        self.stats['forced'] += 1
+                        break
+                    self.stats['memory_waits'] += 1
+                if not waited:
+                    waited = True
+                    self.stats['queued'] += 1
+                try:
+                    await asyncio.wait_for_ms(self._changed.wait(), self.POLL_MS)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._queue.remove(url)
+            self._notify()
+        self.active += 1
+        self.stats['admitted'] += 1
+
+    def release(self, url: str) -> None:
+        """
+        Mark a fetch started with acquire() as finished.
+        """
+        self.active -= 1
+        self._notify()
+
+    def _notify(self) -> None:
+        # Wake every waiter; each re-checks whether it is at the head of the queue
+        self._changed.set()
+        self._changed.clear()
@@ -0,0 +1,208 @@
+import random
+import time
+
+# Breaker states
+CLOSED = "closed"        # Requests flow normally
+OPEN = "open"            # Too many failures: no requests until the cool-down ends
+HALF_OPEN = "half_open"  # Cool-down over: a single probe request decides
+
+# Requests per minute and burst size for hosts with known rate limits
+DEFAULT_RATE_LIMITS = {
+    "api.coingecko.com": (10, 3),
+}
+
+
+class HostPolicy:
+    """
+    Per-host request policy shared by all endpoints on the same host:
+
+    - a token bucket limits the request rate,
+    - a Retry-After header (429/503) blocks the host for the requested time,
+    - failed attempts back off exponentially with full jitter, so a fleet of
+      devices does not retry in lock-step,
+    - a circuit breaker opens after repeated failures, keeping a dead host from
+      being hammered every TTL, and half-opens after a cool-down to let one
+      probe request through. The cool-down doubles each time a probe fails;
+      a probe that reports no outcome within `probe_timeout` counts as failed.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: int = 60,
+        burst: int = 5,
+        rate_limits: dict = None,
+        failure_threshold: int = 3,
+        open_seconds: int = 60,
+        max_open_seconds: int = 900,
+        base_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        probe_timeout: int = 60
+    ) -> None:
+        """
+        :param rate_per_minute:   Default request rate per host.
+        :param burst:             Default number of requests that may be sent back to back.
+        :param rate_limits:       {host: (rate_per_minute, burst)} overrides.
+        :param failure_threshold: Consecutive failures that open the breaker.
+        :param open_seconds:      Initial cool-down of an open breaker.
+        :param max_open_seconds:  Upper bound for the doubling cool-down.
+        :param base_backoff:      Seconds of the first retry backoff (before jitter).
+        :param max_backoff:       Upper bound for a single retry backoff.
+        :param probe_timeout:     Seconds after which an unanswered half-open probe counts as failed.
+        """
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.rate_limits = DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.probe_timeout_ms = probe_timeout * 1000
+        self._hosts = {}
+
+    def _host(self, host: str) -> dict:
+        state = self._hosts.get(host)
+        if state is None:
+            rate, burst = self.rate_limits.get(host, (self.rate_per_minute, self.burst))
+            state = {
+                'rate': rate,
+                'burst': burst,
+                'tokens': float(burst),
+                'refilled_ms': time.ticks_ms(),
+                'breaker': CLOSED,
+                'failures': 0,          # Consecutive failures
+                'open_ms': 0,           # Current cool-down length
+                'open_until_ms': None,  # End of the cool-down while OPEN
+                'blocked_until_ms': None,  # From Retry-After
+                'probing': False,       # A HALF_OPEN probe is in flight
+                'probe_until_ms': None,  # Deadline of that probe
+                'trips': 0,
+                'throttled': 0
+            }
+            self._hosts[host] = state
+        return state
+
+    def _refill(self, state: dict, now: int) -> None:
+        elapsed = time.ticks_diff(now, state['refilled_ms'])
+        if elapsed > 0:
+            state['tokens'] = min(state['burst'], state['tokens'] + elapsed * state['rate'] / 60000)
+            state['refilled_ms'] = now
+
+    def delay_ms(self, host: str) -> int:
+        """
+        :return: Milliseconds until a request to `host` would be allowed (0 if now).
+        """
+        state = self._host(host)
+        now = time.ticks_ms()
+        delay = 0
+        if (state['breaker'] == HALF_OPEN and state['probing']
+                and time.ticks_diff(now, state['probe_until_ms']) >= 0):
+            # The probe never reported back (e.g. it was cancelled): treat it as failed
+            print(f"[HostPolicy] {host}: probe timed out")
+            self.record_failure(host)
+        if state['blocked_until_ms'] is not None:
+            delay = max(delay, time.ticks_diff(state['blocked_until_ms'], now))
+        if state['breaker'] == OPEN:
+            delay = max(delay, time.ticks_diff(state['open_until_ms'], now))
+        elif state['breaker'] == HALF_OPEN and state['probing']:
+            delay = max(delay, time.ticks_diff(state['probe_until_ms'], now))
+        self._refill(state, now)
+        if state['tokens'] < 1:
+            delay = max(delay, int((1 - state['tokens']) * 60000 / state['rate']) + 1)
+        return max(0, delay)
+
+    def acquire(self, host: str) -> int:
+        """
+        Ask to send a request now. On success a token is consumed and, if the
+        breaker's cool-down has ended, the request becomes the half-open probe.
+        :return: 0 if the request may go ahead, otherwise the milliseconds to wait.
+        """
+        state = self._host(host)
+        if state['breaker'] == OPEN and time.ticks_diff(time.ticks_ms(), state['open_until_ms']) >= 0:
+            state['breaker'] = HALF_OPEN
+            state['probing'] = False
+            print(f"[HostPolicy] {host}: circuit half-open, sending a probe")
+        delay = self.delay_ms(host)
+        if delay > 0:
+            state['throttled'] += 1
+            return delay
+        state['blocked_until_ms'] = None
+        state['tokens'] -= 1
+        if state['breaker'] == HALF_OPEN:
+            state['probing'] = True
+            state['probe_until_ms'] = time.ticks_add(time.ticks_ms(), self.probe_timeout_ms)
+        return 0
+
+    def record_success(self, host: str) -> None:
+        """
+        The host answered (any response that is not a rate limit or server error).
+        """
+        state = self._host(host)
+        if state['breaker'] != CLOSED:
+            print(f"[HostPolicy] {host}: circuit closed")
+        state['breaker'] = CLOSED
+        state['failures'] = 0
+        state['open_ms'] = 0
+        state['probing'] = False
+
+    def record_failure(self, host: str, retry_after: int = None) -> None:
+        """
+        A request failed (network error, timeout, 429 or 5xx).
+        :param retry_after: Seconds from a Retry-After header, if any.
+        """
+        state = self._host(host)
+        now = time.ticks_ms()
+        state['failures'] += 1
+        if retry_after is not None:
+            state['blocked_until_ms'] = time.ticks_add(now, retry_after * 1000)
+            print(f"[HostPolicy] {host}: server asked to retry after {retry_after} s")
+
+        if state['breaker'] == HALF_OPEN or state['failures'] >= self.failure_threshold:
+            if state['breaker'] == HALF_OPEN:
+                state['open_ms'] = min(self.max_open_seconds * 1000, state['open_ms'] * 2)
+            else:
+                state['open_ms'] = self.open_seconds * 1000
+            state['breaker'] = OPEN
+            state['open_until_ms'] = time.ticks_add(now, state['open_ms'])
+            state['probing'] = False
+            state['trips'] += 1
+            print(f"[HostPolicy] {host}: circuit open for {state['open_ms'] // 1000} s")
+
+    def backoff_ms(self, attempt: int) -> int:
+        """
+        Exponential backoff with full jitter: a random delay between 0 and
+        base_backoff * 2**attempt seconds, capped at max_backoff.
+        """
+        cap = min(self.max_backoff, self.base_backoff * (2 ** attempt)) * 1000
+        return int(cap * random.getrandbits(16) / 65536)
+
+    def state(self) -> dict:
+        """
+        :return: {host: {...}} with breaker state, failures, tokens and counters.
+        """
+        now = time.ticks_ms()
+        report = {}
+        for host, state in self._hosts.items():
+            self._refill(state, now)
+            report[host] = {
+                'breaker': state['breaker'],
+                'failures': state['failures'],
+                'tokens': round(state['tokens'], 2),
+                'retry_in_ms': self.delay_ms(host),
+                'trips': state['trips'],
+                'throttled': state['throttled'],
+            }
+        return report
+
+
+def parse_retry_after(value):
+    """
+    :param value: A Retry-After header value.
+    :return: Delay in seconds, or None if absent or given as an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0, int(value.strip()))
+    except ValueError:
+        return None
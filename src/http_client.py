@@ -0,0 +1,480 @@
+import uasyncio as asyncio
+import json
+import time
+import content_encoding
+from dns_cache import default_cache
+
+
+def parse_url(url: str):
+    """
+    Split a URL into its components.
+    :param url: An http:// or https:// URL.
+    :return: Tuple of (proto, host, port, path). `path` always starts with '/'.
+    """
+    try:
+        proto, _, host, path = url.split("/", 3)
+    except ValueError:
+        proto, _, host = url.split("/", 2)
+        path = ""
+
+    if proto == "http:":
+        port = 80
+    elif proto == "https:":
+        port = 443
+    else:
+        raise ValueError("Unsupported protocol: " + proto)
+
+    if ":" in host:
+        host, port = host.split(":", 1)
+        port = int(port)
+
+    return proto, host, port, "/" + path
+
+
+class _CompressedInput:
+    """
+    Blocking stream over the compressed bytes received so far, for DeflateIO.
+    DeflateIO pulls its input synchronously, so HttpResponse tops this buffer
+    up from the socket before every decode step; it never waits itself.
+    """
+
+    def __init__(self) -> None:
+        self._buf = b""
+        self._pos = 0
+        self.eof = False  # The whole compressed body has been fed
+
+    def available(self) -> int:
+        return len(self._buf) - self._pos
+
+    def feed(self, data: bytes) -> None:
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+
+    def read(self, size: int = -1) -> bytes:
+        n = self.available() if size < 0 else min(size, self.available())
+        if n == 0 and size != 0 and not self.eof:
+            raise OSError("Compressed input exhausted mid-body")
+        data = self._buf[self._pos:self._pos + n]
+        self._pos += n
+        return data
+
+    def readinto(self, buf) -> int:
+        data = self.read(len(buf))
+        buf[:len(data)] = data
+        return len(data)
+
+
+class HttpResponse:
+    """
+    A response whose body is read lazily from the underlying stream.
+    The body is framed by Content-Length or chunked transfer-encoding, so the
+    connection can go back to the client's keep-alive pool once it is consumed.
+    A gzip/deflate encoded body is decompressed transparently as it streams,
+    holding only the decoder window and a little compressed input in RAM.
+    Always call close() (or use read()/json(), which close for you).
+    """
+
+    # Unread bytes we are willing to drain on close() to keep the connection reusable
+    DRAIN_LIMIT = 2048
+    # Decoded bytes produced per decode step, and compressed bytes kept buffered
+    # ahead of each step. A step consumes far less input than the margin unless
+    # the stream is pathological, in which case decoding fails instead of blocking.
+    INFLATE_STEP = 256
+    INFLATE_MARGIN = 1024
+
+    def __init__(self, client, pool_key, reader, writer, status: int, headers: dict, timeout: int) -> None:
+        """
+        :param client:   The HttpClient that owns the connection pool.
+        :param pool_key: (proto, host, port) the connection belongs to.
+        :param reader:   The uasyncio stream the body is read from.
+        :param writer:   The uasyncio stream used to close the connection.
+        :param status:   HTTP status code.
+        :param headers:  Response headers, keys lower-cased.
+        :param timeout:  Per-read timeout in seconds.
+        """
+        self.client = client
+        self.pool_key = pool_key
+        self.reader = reader
+        self.writer = writer
+        self.status = status
+        self.headers = headers
+        self.timeout = timeout
+
+        self._chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+        self._chunk_left = 0
+        length = headers.get("content-length")
+        self._remaining = int(length) if length is not None else -1
+        if status == 204 or status == 304 or status < 200:
+            self._remaining = 0  # No body
+        self._done = False
+        # Without framing the body ends at EOF and the connection cannot be reused
+        self._reusable = (
+            (self._chunked or self._remaining >= 0)
+            and headers.get("connection", "").lower() != "close"
+        )
+
+        encoding = headers.get("content-encoding", "").strip().lower()
+        self._encoding = encoding if content_encoding.supported(encoding) else None
+        self._decoder = None
+        self._compressed = None
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+
+    async def _readline(self) -> bytes:
+        return await asyncio.wait_for(self.reader.readline(), self.timeout)
+
+    async def _read(self, size: int) -> bytes:
+        data = await asyncio.wait_for(self.reader.read(size), self.timeout)
+        if not data:
+            raise OSError("Connection closed before end of body")
+        self.wire_bytes += len(data)
+        return data
+
+    async def read_chunk(self, size: int = 512) -> bytes:
+        """
+        Read up to `size` bytes of the (decoded) body.
+        :return: The next chunk, or b"" once the body has been consumed.
+        """
+        if self._encoding is None:
+            data = await self._read_raw(size)
+        else:
+            if self._decoder is None:
+                if self.reader is None:
+                    return b""
+                self._compressed = _CompressedInput()
+                self._decoder = content_encoding.open_decoder(self._encoding, self._compressed)
+            data = await self._inflate(size)
+        self.decoded_bytes += len(data)
+        return data
+
+    async def _inflate(self, size: int) -> bytes:
+        """
+        Decode up to `size` bytes, reading compressed input from the socket
+        between small decode steps.
+        """
+        compressed = self._compressed
+        parts = []
+        got = 0
+        while got < size:
+            while not compressed.eof and compressed.available() < self.INFLATE_MARGIN:
+                chunk = await self._read_raw(512)
+                if chunk:
+                    compressed.feed(chunk)
+                else:
+                    compressed.eof = True
+            data = self._decoder.read(min(self.INFLATE_STEP, size - got))
+            if not data:
+                break
+            parts.append(data)
+            got += len(data)
+        return parts[0] if len(parts) == 1 else b"".join(parts)
+
+    async def _read_raw(self, size: int) -> bytes:
+        """
+        Read up to `size` bytes of the body as sent on the wire.
+        :return: The next chunk, or b"" once the body has been consumed.
+        """
+        if self._done or self.reader is None:
+            return b""
+
+        if self._chunked:
+            if self._chunk_left == 0:
+                line = await self._readline()
+                self._chunk_left = int(line.split(b";", 1)[0].strip(), 16)
+                if self._chunk_left == 0:
+                    # Last chunk: skip optional trailers up to the blank line
+                    while True:
+                        line = await self._readline()
+                        if not line or line == b"\r\n":
+                            break
+                    self._done = True
+                    return b""
+            data = await self._read(min(size, self._chunk_left))
+            self._chunk_left -= len(data)
+            if self._chunk_left == 0:
+                await asyncio.wait_for(self.reader.readexactly(2), self.timeout)  # CRLF after chunk
+            return data
+
+        if self._remaining >= 0:
+            if self._remaining == 0:
+                self._done = True
+                return b""
+            data = await self._read(min(size, self._remaining))
+            self._remaining -= len(data)
+            if self._remaining == 0:
+                self._done = True
+            return data
+
+        data = await asyncio.wait_for(self.reader.read(size), self.timeout)
+        if not data:
+            self._done = True
+        self.wire_bytes += len(data)
+        return data
+
+    async def read(self) -> bytes:
+        """
+        Read the whole body and close (or release) the connection.
+        :return: The response body.
+        """
+        try:
+            parts = []
+            while True:
+                chunk = await self.read_chunk()
+                if not chunk:
+                    break
+                parts.append(chunk)
+            return b"".join(parts)
+        finally:
+            await self.close()
+
+    async def json(self):
+        """
+        Read the whole body and parse it as JSON.
+        :return: The parsed JSON value.
+        """
+        return json.loads(await self.read())
+
+    async def close(self) -> None:
+        """
+        Release the connection to the keep-alive pool if the body was fully read
+        (draining a small unread remainder first), otherwise close it.
+        Safe to call more than once.
+        """
+        if self.writer is None:
+            return
+        if self._reusable and not self._done:
+            try:
+                drained = 0
+                while not self._done and drained <= self.DRAIN_LIMIT:
+                    drained += len(await self._read_raw(512))
+            except Exception:
+                self._reusable = False
+
+        reader, writer = self.reader, self.writer
+        self.reader = None
+        self.writer = None
+        self._decoder = None
+        self.client._account(self)
+        if self._reusable and self._done:
+            self.client._release(self.pool_key, reader, writer)
+        else:
+            await _close_stream(writer)
+
+
+async def _close_stream(writer) -> None:
+    try:
+        await writer.aclose()
+    except Exception:
+        pass
+
+
+class HttpClient:
+    """
+    Minimal non-blocking HTTP/1.1 client built on uasyncio.open_connection.
+    Every network wait is bounded by a timeout, and cancelling the calling task
+    closes the socket, so fetching never stalls the rest of the event loop.
+
+    Connections are kept alive and pooled per (scheme, host, port), so
+    back-to-back requests to the same host skip the TCP and TLS handshakes.
+    """
+
+    def __init__(self, timeout: int = 10, max_pool_size: int = 2, idle_timeout: int = 30, dns_cache=None) -> None:
+        """
+        :param timeout:       Default timeout (seconds) for connecting and for each read.
+        :param max_pool_size: Maximum number of idle connections kept open (each TLS
+                              session holds tens of KB of RAM).
+        :param idle_timeout:  Seconds after which an idle pooled connection is closed.
+        :param dns_cache:     Resolver cache. Defaults to the one shared with urlopen.
+        """
+        self.timeout = timeout
+        self.max_pool_size = max_pool_size
+        self.idle_timeout = idle_timeout
+        self.dns_cache = dns_cache or default_cache
+        self._ssl_context = None
+        self._pool = {}  # (proto, host, port) -> list of (reader, writer, released_ms)
+        self.pool_stats = {
+            'opened': 0,
+            'reused': 0,
+            'stale': 0
+        }
+        self.transfer_stats = {
+            'responses': 0,
+            'compressed': 0,
+            'wire_bytes': 0,
+            'decoded_bytes': 0
+        }
+
+    def _get_ssl_context(self):
+        """
+        Lazily create the shared TLS client context.
+        """
+        if self._ssl_context is None:
+            import tls
+            context = tls.SSLContext(tls.PROTOCOL_TLS_CLIENT)
+            context.verify_mode = tls.CERT_NONE
+            self._ssl_context = context
+        return self._ssl_context
+
+    async def _open(self, proto: str, host: str, port: int):
+        """
+        Open a (optionally TLS wrapped) stream to host:port.
+        :return: Tuple of (reader, writer).
+        """
+        # Connect to the cached address; SNI still needs the real host name
+        ip = self.dns_cache.resolve_ip(host, port)
+        if proto == "https:":
+            return await asyncio.open_connection(ip, port, ssl=self._get_ssl_context(), server_hostname=host)
+        return await asyncio.open_connection(ip, port)
+
+    def warm_dns(self, urls) -> None:
+        """
+        Resolve the hosts of the given URLs ahead of their first request.
+        """
+        hosts = set()
+        for url in urls:
+            try:
+                _, host, port, _ = parse_url(url)
+            except ValueError:
+                continue
+            hosts.add((host, port))
+        self.dns_cache.warm(hosts)
+
+    def _pooled_count(self) -> int:
+        return sum(len(conns) for conns in self._pool.values())
+
+    def _take(self, key):
+        """
+        Take the most recently released idle connection for `key`, if any is still fresh.
+        :return: Tuple of (reader, writer), or None.
+        """
+        conns = self._pool.get(key)
+        now = time.ticks_ms()
+        while conns:
+            reader, writer, released_ms = conns.pop()
+            if time.ticks_diff(now, released_ms) < self.idle_timeout * 1000:
+                return reader, writer
+            asyncio.create_task(_close_stream(writer))
+        return None
+
+    def _release(self, key, reader, writer) -> None:
+        """
+        Return a connection whose response was fully read to the pool, evicting the
+        oldest idle connection if the pool is full.
+        """
+        if self._pooled_count() >= self.max_pool_size:
+            oldest_key = None
+            oldest_ms = None
+            for pool_key, conns in self._pool.items():
+                if conns and (oldest_ms is None or time.ticks_diff(conns[0][2], oldest_ms) < 0):
+                    oldest_key = pool_key
+                    oldest_ms = conns[0][2]
+            if oldest_key is not None:
+                asyncio.create_task(_close_stream(self._pool[oldest_key].pop(0)[1]))
+        self._pool.setdefault(key, []).append((reader, writer, time.ticks_ms()))
+
+    def _account(self, response: HttpResponse) -> None:
+        """
+        Add a finished response to the transfer counters.
+        """
+        stats = self.transfer_stats
+        stats['responses'] += 1
+        if response._encoding is not None:
+            stats['compressed'] += 1
+        stats['wire_bytes'] += response.wire_bytes
+        stats['decoded_bytes'] += response.decoded_bytes
+
+    async def close_idle(self) -> None:
+        """
+        Close every idle pooled connection (e.g. to free RAM).
+        """
+        pool = self._pool
+        self._pool = {}
+        for conns in pool.values():
+            for _, writer, _ in conns:
+                await _close_stream(writer)
+
+    async def _read_head(self, reader):
+        """
+        Read the status line and headers of a response.
+        :return: Tuple of (status, headers) with header names lower-cased.
+        """
+        status_line = await reader.readline()
+        if not status_line:
+            raise OSError("Connection closed before response")
+        parts = status_line.split(None, 2)
+        if len(parts) < 2:
+            raise ValueError("Malformed status line: " + repr(status_line))
+        status = int(parts[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if not line or line == b"\r\n":
+                break
+            if b":" in line:
+                key, value = line.decode().split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        return status, headers
+
+    async def request(self, method: str, url: str, headers: dict = None, data: bytes = None, timeout: int = None) -> HttpResponse:
+        """
+        Send a request and return once the response headers have arrived.
+        A pooled connection that turns out to have been closed by the server is
+        replaced by a fresh one transparently.
+        :param method:  HTTP method, e.g. "GET".
+        :param url:     The full request URL.
+        :param headers: Optional extra request headers.
+        :param data:    Optional request body.
+        :param timeout: Overrides the client's default timeout for this request.
+        :return: An HttpResponse whose body has not been read yet.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        proto, host, port, path = parse_url(url)
+        key = (proto, host, port)
+
+        request = "%s %s HTTP/1.1\r\nHost: %s\r\nConnection: keep-alive\r\n" % (method, path, host)
+        if content_encoding.ACCEPT_ENCODING and not (headers and "Accept-Encoding" in headers):
+            request += "Accept-Encoding: %s\r\n" % content_encoding.ACCEPT_ENCODING
+        if headers:
+            for name, value in headers.items():
+                request += "%s: %s\r\n" % (name, value)
+        if data:
+            request += "Content-Length: %d\r\n" % len(data)
+        request = (request + "\r\n").encode()
+
+        while True:
+            conn = self._take(key)
+            reused = conn is not None
+            if reused:
+                reader, writer = conn
+                self.pool_stats['reused'] += 1
+            else:
+                reader, writer = await asyncio.wait_for(self._open(proto, host, port), timeout)
+                self.pool_stats['opened'] += 1
+
+            try:
+                writer.write(request)
+                if data:
+                    writer.write(data)
+                await asyncio.wait_for(writer.drain(), timeout)
+                status, response_headers = await asyncio.wait_for(self._read_head(reader), timeout)
+            except OSError:
+                await _close_stream(writer)
+                if reused:
+                    # The server dropped the idle connection; retry on a new one
+                    self.pool_stats['stale'] += 1
+                    continue
+                raise
+            except BaseException:
+                # Includes CancelledError: never leak the socket
+                await _close_stream(writer)
+                raise
+
+            return HttpResponse(self, key, reader, writer, status, response_headers, timeout)
+
+    async def get(self, url: str, headers: dict = None, timeout: int = None) -> HttpResponse:
+        """
+        Shorthand for request("GET", ...).
+        """
+        return await self.request("GET", url, headers=headers, timeout=timeout)
@@ -0,0 +1,293 @@
+import json
+
+# Tokenizer byte values
+_QUOTE = ord('"')
+_COLON = ord(":")
+_COMMA = ord(",")
+_OPEN_OBJ = ord("{")
+_CLOSE_OBJ = ord("}")
+_OPEN_ARR = ord("[")
+_CLOSE_ARR = ord("]")
+_WHITESPACE = b" \t\r\n"
+_SCALAR_END = b",]} \t\r\n"
+
+# Container frame states. _START expects a key (object) or a value (array), or the closing bracket
+_START = 0
+_COLON_NEXT = 1
+_VALUE = 2
+_COMMA_OR_END = 3
+
+# Kinds of raw value being read
+_RAW_STRING = 0
+_RAW_SCALAR = 1
+_RAW_CONTAINER = 2
+
+
+def split_path(path: str) -> list:
+    """
+    Split a dotted JSON path into keys; numeric segments index into lists.
+    e.g. "data.0.value" -> ["data", 0, "value"]
+    """
+    return [int(key) if key.isdigit() else key for key in path.split(".")]
+
+
+class JsonPathStream:
+    """
+    Incremental (SAX-style) JSON tokenizer that extracts only the values at the
+    requested dotted paths. Feed it the document in chunks of any size; memory use
+    is bounded by the nesting depth and the size of the matched values, never by
+    the size of the document. Values outside the requested paths are skipped
+    without being buffered.
+
+    Usage:
+        parser = JsonPathStream(["market_data.ath.usd"])
+        while not parser.done:
+            chunk = stream.read(512)
+            if not chunk:
+                break
+            parser.feed(chunk)
+        parser.close()
+        parser.results  # {"market_data.ath.usd": 73738}
+    """
+
+    def __init__(self, paths) -> None:
+        """
+        :param paths: Iterable of dotted paths to extract.
+        """
+        self._targets = {}      # tuple(keys) -> path string
+        self._prefixes = set()  # every proper prefix of a target
+        for path in paths:
+            keys = tuple(split_path(path))
+            self._targets[keys] = path
+            for i in range(len(keys)):
+                self._prefixes.add(keys[:i])
+
+        self.results = {}
+        self._stack = []        # frames: [is_object, key_or_index, state]
+        self._finished = False  # the root value has been fully read
+
+        # State of the raw value currently being read (string, scalar or skipped/captured container)
+        self._raw = None
+        self._raw_is_key = False
+        self._raw_keep = False
+        self._raw_target = None
+        self._raw_started = False
+        self._raw_depth = 0
+        self._raw_in_string = False
+        self._raw_escape = False
+        self._buf = []
+
+    @property
+    def done(self) -> bool:
+        """
+        True once every requested path was found or the document ended.
+        Callers may stop reading as soon as this is set.
+        """
+        return self._finished or len(self.results) == len(self._targets)
+
+    def feed(self, chunk) -> None:
+        """
+        Consume the next piece of the document.
+        :param chunk: bytes (preferred) or str.
+        :raises ValueError: On malformed JSON.
+        """
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        i = 0
+        n = len(chunk)
+        while i < n and not self.done:
+            if self._raw is not None:
+                i = self._feed_raw(chunk, i, n)
+                continue
+
+            c = chunk[i]
+            if c in _WHITESPACE:
+                i += 1
+                continue
+
+            if not self._stack:
+                i = self._begin_value(chunk, i)
+                continue
+
+            frame = self._stack[-1]
+            state = frame[2]
+            if frame[0]:  # Object
+                if state == _START and c == _QUOTE:
+                    self._start_raw(_RAW_STRING, keep=True, is_key=True)
+                elif state == _START and c == _CLOSE_OBJ:
+                    self._end_container()
+                    i += 1
+                elif state == _COLON_NEXT and c == _COLON:
+                    frame[2] = _VALUE
+                    i += 1
+                elif state == _VALUE:
+                    i = self._begin_value(chunk, i)
+                elif state == _COMMA_OR_END and c == _COMMA:
+                    frame[2] = _START
+                    i += 1
+                elif state == _COMMA_OR_END and c == _CLOSE_OBJ:
+                    self._end_container()
+                    i += 1
+                else:
+                    raise ValueError("Unexpected %r in object" % chr(c))
+            else:  # Array
+                if state == _COMMA_OR_END and c == _COMMA:
+                    frame[1] += 1
+                    frame[2] = _VALUE
+                    i += 1
+                elif state != _VALUE and c == _CLOSE_ARR:
+                    self._end_container()
+                    i += 1
+                elif state != _COMMA_OR_END:
+                    i = self._begin_value(chunk, i)
+                else:
+                    raise ValueError("Unexpected %r in array" % chr(c))
+
+    def close(self) -> None:
+        """
+        Signal the end of the document, completing a trailing top-level scalar.
+        """
+        if self._raw == _RAW_SCALAR:
+            self._finish_raw()
+
+    def _begin_value(self, chunk, i: int) -> int:
+        """
+        Decide what to do with the value starting at chunk[i]: capture it, descend
+        into it, or skip it.
+        :return: The index to continue from.
+        """
+        path = tuple(frame[1] for frame in self._stack)
+        if self._stack:
+            self._stack[-1][2] = _COMMA_OR_END
+        c = chunk[i]
+
+        keep = path in self._targets
+        if not keep and path in self._prefixes and (c == _OPEN_OBJ or c == _OPEN_ARR):
+            if c == _OPEN_OBJ:
+                self._stack.append([True, None, _START])
+            else:
+                self._stack.append([False, 0, _START])
+            return i + 1
+
+        if c == _QUOTE:
+            kind = _RAW_STRING
+        elif c == _OPEN_OBJ or c == _OPEN_ARR:
+            kind = _RAW_CONTAINER
+        else:
+            kind = _RAW_SCALAR
+        self._start_raw(kind, keep=keep, target=path)
+        return i
+
+    def _end_container(self) -> None:
+        self._stack.pop()
+        if not self._stack:
+            self._finished = True
+
+    def _start_raw(self, kind: int, keep: bool, is_key: bool = False, target=None) -> None:
+        self._raw = kind
+        self._raw_keep = keep
+        self._raw_is_key = is_key
+        self._raw_target = target
+        self._raw_started = False
+        self._raw_depth = 0
+        self._raw_in_string = False
+        self._raw_escape = False
+        self._buf = []
+
+    def _scan_string(self, chunk, j: int, n: int):
+        """
+        Advance through string contents (after the opening quote).
+        :return: Tuple of (index after the scan, True if the closing quote was consumed).
+        """
+        while j < n:
+            if self._raw_escape:
+                self._raw_escape = False
+                j += 1
+                continue
+            quote = chunk.find(b'"', j)
+            backslash = chunk.find(b"\\", j, quote if quote >= 0 else n)
+            if backslash >= 0:
+                self._raw_escape = True
+                j = backslash + 1
+                continue
+            if quote < 0:
+                return n, False
+            return quote + 1, True
+        return j, False
+
+    def _feed_raw(self, chunk, i: int, n: int) -> int:
+        """
+        Continue reading the current raw value from chunk[i:].
+        :return: The index to continue from.
+        """
+        j = i
+        complete = False
+        kind = self._raw
+
+        if kind == _RAW_STRING:
+            if not self._raw_started:
+                self._raw_started = True
+                j += 1  # Opening quote
+            j, complete = self._scan_string(chunk, j, n)
+
+        elif kind == _RAW_SCALAR:
+            while j < n and chunk[j] not in _SCALAR_END:
+                j += 1
+            complete = j < n
+
+        else:
+            while j < n:
+                if self._raw_in_string:
+                    j, closed = self._scan_string(chunk, j, n)
+                    if closed:
+                        self._raw_in_string = False
+                    continue
+                c = chunk[j]
+                j += 1
+                if c == _QUOTE:
+                    self._raw_in_string = True
+                elif c == _OPEN_OBJ or c == _OPEN_ARR:
+                    self._raw_depth += 1
+                elif c == _CLOSE_OBJ or c == _CLOSE_ARR:
+                    self._raw_depth -= 1
+                    if self._raw_depth == 0:
+                        complete = True
+                        break
+
+        if self._raw_keep:
+            self._buf.append(chunk[i:j])
+        if complete:
+            self._finish_raw()
+        return j
+
+    def _finish_raw(self) -> None:
+        raw = b"".join(self._buf)
+        self._buf = []
+        self._raw = None
+        if self._raw_is_key:
+            frame = self._stack[-1]
+            frame[1] = json.loads(raw)
+            frame[2] = _COLON_NEXT
+        elif self._raw_keep:
+            self.results[self._targets[self._raw_target]] = json.loads(raw)
+        if not self._stack:
+            self._finished = True
+
+
+def parse_stream(read, paths, chunk_size: int = 512) -> dict:
+    """
+    Extract values from a blocking file-like stream.
+    Stops reading as soon as all paths have been found.
+    :param read:       A read(size) callable, e.g. a socket's or file's read method.
+    :param paths:      Iterable of dotted paths to extract.
+    :param chunk_size: Bytes to read per call.
+    :return: Dict mapping each found path to its value.
+    """
+    parser = JsonPathStream(paths)
+    while not parser.done:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        parser.feed(chunk)
+    parser.close()
+    return parser.results
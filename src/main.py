@@ -10,6 +10,7 @@ from applet_manager import AppletManager
 from system_applets import ap_applet
 from config import ConfigManager
 from initialization import Initializer # Import the new Initializer
+from memory_policy import default_policy
 
 RGBLED(6, 7, 8).set_rgb(0, 0, 0)
 
@@ -20,6 +21,8 @@ async def main() -> None:
     and starts the web server. It keeps an asynchronous loop alive to service
     other tasks such as applets and data retrieval.
     """
+    # Collections run on an allocation budget and at fetch/transition points, not per frame
+    default_policy.install()
     config_manager = ConfigManager()
     screen_manager = ScreenManager(config_manager=config_manager)
     data_manager = DataManager()
@@ -54,6 +57,12 @@ async def main() -> None:
 
         # Start the main applet loop *after* initialization
         asyncio.create_task(applet_manager_instance.start_applets())
+
+        if config_manager.get_price_stream():
+            # Imported only when enabled: the WebSocket client is not needed otherwise
+            from price_stream import PriceStream, BINANCE_STREAM_URL
+            price_stream = PriceStream(data_manager, config_manager.get_price_stream_url() or BINANCE_STREAM_URL)
+            asyncio.create_task(price_stream.run())
     else:
         print("[Main] No saved networks found or unable to connect. Setting up AP mode.")
         # Optionally run parts of initializer even in AP mode? For now, only run in STA mode.
@@ -0,0 +1,96 @@
+import gc
+import time
+
+
+class MemoryPolicy:
+    """
+    Decides when the heap is garbage collected, instead of collecting after
+    every frame. Collections happen:
+
+    - automatically once `threshold_bytes` have been allocated since the last
+      one (gc.threshold), which bounds the garbage any code path can pile up,
+    - explicitly at points that just produced a lot of garbage or are about to
+      need a lot of memory: after a fetch, when switching applets (collect()),
+    - at cheap checkpoints such as frame boundaries, but only when free heap
+      has fallen below `low_watermark` (checkpoint()).
+
+    Counts and times every collection it triggers; collections triggered by
+    the allocation threshold happen inside the VM and are not counted.
+    """
+
+    def __init__(self, threshold_bytes: int = 24 * 1024, low_watermark: int = 48 * 1024) -> None:
+        """
+        :param threshold_bytes: Bytes allocated after which MicroPython collects by itself.
+        :param low_watermark:   Free heap below which a checkpoint collects.
+        """
+        self.threshold_bytes = threshold_bytes
+        self.low_watermark = low_watermark
+        self.collections = 0
+        self.total_ms = 0
+        self.max_ms = 0
+        self.by_reason = {}  # reason -> number of collections
+        # Monotonic uptime for the per-minute rate: time.time() jumps when NTP
+        # sets the clock, and a single ticks_diff() spans less than a week
+        self._elapsed_ms = 0
+        self._last_ticks = time.ticks_ms()
+
+    def install(self) -> None:
+        """
+        Apply the allocation threshold. Call once at startup.
+        """
+        try:
+            gc.threshold(self.threshold_bytes)
+        except AttributeError:
+            pass  # Port without gc.threshold(): collections only happen on explicit calls
+        print(f"[MemoryPolicy] GC threshold {self.threshold_bytes} bytes, "
+              f"low watermark {self.low_watermark} bytes, {gc.mem_free()} bytes free")
+
+    def collect(self, reason: str) -> int:
+        """
+        Collect now.
+        :param reason: Label under which the collection is counted.
+        :return: Milliseconds the collection took.
+        """
+        self._uptime_ms()  # Sample often enough that ticks_ms() cannot wrap in between
+        start = time.ticks_ms()
+        gc.collect()
+        elapsed = time.ticks_diff(time.ticks_ms(), start)
+        self.collections += 1
+        self.total_ms += elapsed
+        if elapsed > self.max_ms:
+            self.max_ms = elapsed
+        self.by_reason[reason] = self.by_reason.get(reason, 0) + 1
+        return elapsed
+
+    def checkpoint(self, reason: str) -> bool:
+        """
+        Collect only if free heap is below the low watermark.
+        :return: True if a collection ran.
+        """
+        if gc.mem_free() >= self.low_watermark:
+            return False
+        self.collect(reason)
+        return True
+
+    def _uptime_ms(self) -> int:
+        now = time.ticks_ms()
+        self._elapsed_ms += time.ticks_diff(now, self._last_ticks)
+        self._last_ticks = now
+        return self._elapsed_ms
+
+    def stats(self) -> dict:
+        """
+        :return: Collections (total, per minute, by reason), time spent in them and free heap.
+        """
+        minutes = self._uptime_ms() / 60000
+        return {
+            'collections': self.collections,
+            'per_minute': round(self.collections / minutes, 2) if minutes > 0 else 0,
+            'total_ms': self.total_ms,
+            'max_ms': self.max_ms,
+            'by_reason': dict(self.by_reason),
+            'mem_free': gc.mem_free(),
+        }
+
+
+default_policy = MemoryPolicy()
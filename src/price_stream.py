@@ -0,0 +1,186 @@
+import uasyncio as asyncio
+import json
+import random
+import time
+from ws_client import WebSocketClient
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream?streams=btcusdt@miniTicker/btceur@miniTicker"
+
+# Stream name -> REST endpoint whose cached data the stream keeps current
+BINANCE_STREAMS = {
+    "btcusdt@miniTicker": "https://api.binance.com/api/v3/ticker/24hr?symbol=BTCUSDT",
+    "btceur@miniTicker": "https://api.binance.com/api/v3/ticker/24hr?symbol=BTCEUR",
+}
+
+
+def ticker_from_mini(event: dict) -> dict:
+    """
+    Convert a Binance 24h mini-ticker event into the field names of the REST
+    24h ticker, so applets read pushed and polled data alike.
+    """
+    last = float(event['c'])
+    open_price = float(event['o'])
+    change = last - open_price
+    return {
+        'symbol': event['s'],
+        'lastPrice': event['c'],
+        'openPrice': event['o'],
+        'highPrice': event['h'],
+        'lowPrice': event['l'],
+        'volume': event['v'],
+        'quoteVolume': event['q'],
+        'priceChange': "%.8f" % change,
+        'priceChangePercent': "%.3f" % (change * 100 / open_price if open_price else 0),
+    }
+
+
+class PriceStream:
+    """
+    Keeps the Binance ticker endpoints current from a WebSocket stream instead
+    of polling them. Updates are handed to the DataManager at most once per
+    `min_interval` per endpoint, so applets redraw and the cache changes at a
+    bounded rate. Each push moves the endpoint's next poll a full TTL ahead:
+    while the stream is up nothing is polled, and polling resumes by itself
+    when it goes down.
+
+    Expects Binance's combined stream format ({"stream": ..., "data": {...}}),
+    which a local stand-in server can reproduce for testing via `url`.
+    """
+
+    def __init__(
+        self,
+        data_manager,
+        url: str = BINANCE_STREAM_URL,
+        streams: dict = None,
+        min_interval: int = 5,
+        ping_interval: int = 30,
+        max_backoff: int = 300
+    ) -> None:
+        """
+        :param data_manager:  The DataManager to feed.
+        :param url:           ws:// or wss:// URL of the combined stream.
+        :param streams:       {stream name: endpoint URL}. Defaults to BINANCE_STREAMS.
+        :param min_interval:  Minimum seconds between two updates of one endpoint.
+        :param ping_interval: Seconds of silence after which a ping is sent; after twice
+                              as long without any frame the connection is re-established.
+        :param max_backoff:   Upper bound (seconds) for the delay between reconnects.
+        """
+        self.data_manager = data_manager
+        self.url = url
+        self.streams = BINANCE_STREAMS if streams is None else streams
+        self.min_interval_ms = min_interval * 1000
+        self.ping_interval_ms = ping_interval * 1000
+        self.max_backoff = max_backoff
+        self.running = False
+        self._ws = None
+        self._pending = {}   # endpoint URL -> newest ticker not yet pushed
+        self._pushed_ms = {}  # endpoint URL -> ticks_ms() of the last push
+        self.stats = {
+            'connects': 0,
+            'messages': 0,
+            'pushed': 0,
+            'throttled': 0,
+            'rejected': 0,
+            'malformed': 0
+        }
+
+    async def run(self) -> None:
+        """
+        Connect and process messages until stop() is called, reconnecting with
+        jittered exponential backoff. Schedule as a background task.
+        """
+        self.running = True
+        attempt = 0
+        while self.running:
+            self._ws = WebSocketClient(self.url)
+            keepalive = None
+            try:
+                await self._ws.connect()
+                self.stats['connects'] += 1
+                attempt = 0
+                print(f"[PriceStream] Connected to {self.url}")
+                keepalive = asyncio.create_task(self._keepalive(self._ws))
+                while self.running:
+                    self._handle(await self._ws.recv())
+            except (OSError, asyncio.TimeoutError, ValueError, KeyError) as e:
+                print(f"[PriceStream] Stream error: {e}")
+            except Exception as e:
+                # Anything else must not end the task: the stream would silently stay down
+                print(f"[PriceStream] Unexpected error: {e}")
+            finally:
+                if keepalive is not None:
+                    keepalive.cancel()
+                await self._ws.close()
+            if not self.running:
+                break
+            delay = min(self.max_backoff, 2 ** attempt)
+            attempt += 1
+            # Full jitter, so devices that lost the same server do not reconnect in lock-step
+            delay_ms = int(delay * 1000 * random.getrandbits(16) / 65536) + 1000
+            print(f"[PriceStream] Reconnecting in {delay_ms // 1000} s; polling continues meanwhile")
+            await asyncio.sleep_ms(delay_ms)
+
+    def stop(self) -> None:
+        self.running = False
+        if self._ws is not None:
+            asyncio.create_task(self._ws.close())
+
+    async def _keepalive(self, ws) -> None:
+        """
+        Ping an idle connection and drop one that stays silent, which makes
+        recv() fail and run() reconnect.
+        """
+        while True:
+            await asyncio.sleep_ms(self.ping_interval_ms)
+            idle_ms = time.ticks_diff(time.ticks_ms(), ws.last_rx_ms)
+            if idle_ms >= 2 * self.ping_interval_ms:
+                print(f"[PriceStream] No data for {idle_ms // 1000} s, reconnecting")
+                await ws.abort()
+                return
+            if idle_ms >= self.ping_interval_ms:
+                try:
+                    await ws.ping()
+                except OSError:
+                    return  # recv() notices the broken connection
+
+    def _handle(self, message) -> None:
+        self.stats['messages'] += 1
+        try:
+            event = json.loads(message)
+        except ValueError as e:
+            # A truncated or non-JSON frame is skipped; the connection itself is fine
+            print(f"[PriceStream] Malformed message: {e}")
+            self.stats['malformed'] += 1
+            return
+        if not isinstance(event, dict):
+            self.stats['malformed'] += 1
+            return
+        url = self.streams.get(event.get('stream'))
+        if url is None:
+            return  # Subscription acknowledgements and streams nobody asked for
+        try:
+            ticker = ticker_from_mini(event['data'])
+        except (KeyError, TypeError, ValueError) as e:
+            # One odd event is skipped; the next one carries the full state again
+            print(f"[PriceStream] Malformed event on {event.get('stream')}: {e}")
+            self.stats['malformed'] += 1
+            return
+        self._pending[url] = ticker
+        self._flush(url)
+
+    def _flush(self, url: str) -> None:
+        """
+        Push the newest ticker of an endpoint unless it was updated less than
+        min_interval ago; the next message retries.
+        """
+        now = time.ticks_ms()
+        pushed_ms = self._pushed_ms.get(url)
+        if pushed_ms is not None and time.ticks_diff(now, pushed_ms) < self.min_interval_ms:
+            self.stats['throttled'] += 1
+            return
+        ticker = self._pending.pop(url)
+        if self.data_manager.push_data(url, ticker):
+            self._pushed_ms[url] = now
+            self.stats['pushed'] += 1
+        else:
+            self.stats['rejected'] += 1
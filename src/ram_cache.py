@@ -0,0 +1,119 @@
+class RamCache:
+    """
+    In-memory cache of parsed objects with a byte budget and LRU eviction.
+    Sizes are estimates supplied by the caller (typically the length of the
+    serialized JSON), as MicroPython cannot measure object sizes directly.
+    One entry larger than the whole budget is kept outside of it (the most
+    recently stored one), so an oversized endpoint is not re-read from flash
+    and re-parsed on every access.
+    """
+
+    def __init__(self, budget_bytes: int = 16 * 1024) -> None:
+        """
+        :param budget_bytes: Maximum total estimated size of all entries.
+        """
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self._entries = {}  # key -> [value, size, last_access]
+        self._oversized_key = None  # Entry exceeding the budget, not counted in used_bytes
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.oversized = 0  # Entries stored outside the budget
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Return the cached value for `key` and mark it as recently used.
+        :param key:     Cache key.
+        :param default: Returned when the key is not cached.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self._clock += 1
+        entry[2] = self._clock
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, size: int) -> bool:
+        """
+        Insert or replace an entry, evicting least recently used entries as needed.
+        :param key:   Cache key.
+        :param value: The parsed object to keep in RAM.
+        :param size:  Estimated size of the object in bytes.
+        :return: True if the value was cached within the budget, False if it
+                 is larger than the whole budget and took the oversized slot.
+        """
+        self.remove(key)
+        if size > self.budget_bytes:
+            if self._oversized_key is not None:
+                self.remove(self._oversized_key)
+            print(f"[RamCache] {key} ({size} bytes) exceeds the {self.budget_bytes} byte budget, kept outside it")
+            self.oversized += 1
+            self._clock += 1
+            self._entries[key] = [value, size, self._clock]
+            self._oversized_key = key
+            return False
+        while self.used_bytes + size > self.budget_bytes and self._entries:
+            self._evict_one()
+        self._clock += 1
+        self._entries[key] = [value, size, self._clock]
+        self.used_bytes += size
+        return True
+
+    def replace(self, key, value) -> bool:
+        """
+        Swap the value of an existing entry, keeping its size estimate.
+        :return: False if the key is not cached.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        entry[0] = value
+        return True
+
+    def remove(self, key) -> None:
+        """
+        Drop an entry if present.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        if key == self._oversized_key:
+            self._oversized_key = None
+        else:
+            self.used_bytes -= entry[1]
+
+    def _evict_one(self) -> None:
+        """
+        Evict the least recently used entry.
+        """
+        lru_key = None
+        lru_access = None
+        for key, entry in self._entries.items():
+            if key == self._oversized_key:
+                continue
+            if lru_access is None or entry[2] < lru_access:
+                lru_key = key
+                lru_access = entry[2]
+        self.remove(lru_key)
+        self.evictions += 1
+
+    def stats(self) -> dict:
+        """
+        :return: Usage and hit/miss counters.
+        """
+        return {
+            "entries": len(self._entries),
+            "used_bytes": self.used_bytes,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "oversized": self.oversized,
+        }
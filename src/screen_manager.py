@@ -3,17 +3,38 @@ import jpegdec
 import time
 import ubinascii
 import uio
+from display_damage import DamageTracker, TrackedDisplay
 
 class ScreenManager:
-    def __init__(self, theme=None, config_manager=None):
-        self.display = PicoGraphics(display=DISPLAY_PICO_DISPLAY_2)
+    def __init__(self, theme=None, config_manager=None, region_updates=False, full_update_ratio=0.5):
+        """
+        :param theme:             Colour scheme, defaults to COLOR_SCHEME.
+        :param config_manager:    Source of the timezone and IP shown in the footer.
+        :param region_updates:    Push only the damaged region with display.partial_update().
+                                  Leave off for drivers that do not implement it (the
+                                  ST7789 driver ignores it); unchanged frames are skipped
+                                  either way.
+        :param full_update_ratio: Damaged fraction of the screen above which a full
+                                  update is pushed instead of a region.
+        """
+        self._panel = PicoGraphics(display=DISPLAY_PICO_DISPLAY_2)
+        self.width, self.height = self._panel.get_bounds()
+        # Drawing goes through a wrapper that records which tiles each call touches
+        self.damage = DamageTracker(self.width, self.height)
+        self.display = TrackedDisplay(self._panel, self.damage, self.update)
         self.display.set_backlight(1.0)
         self.theme = theme or self.COLOR_SCHEME
         self.display.set_font("bitmap6")
-        self.j = jpegdec.JPEG(self.display)
+        self.j = jpegdec.JPEG(self._panel)  # The decoder needs the real PicoGraphics
         self.pens = {}
-        self.width, self.height = self.display.get_bounds()
         self.config_manager = config_manager
+        self.region_updates = region_updates and hasattr(self._panel, "partial_update")
+        self.full_update_ratio = full_update_ratio
+        self.update_stats = {
+            'full': 0,
+            'partial': 0,
+            'skipped': 0  # Frames identical to what the panel already shows
+        }
 
 
     COLOR_SCHEME = {
@@ -33,7 +54,27 @@ class ScreenManager:
         return self.display
 
     def update(self):
-        self.display.update()
+        """
+        Push the framebuffer to the panel: nothing if no drawing changed it since
+        the last push, the damaged region if region updates are enabled and it is
+        small enough, otherwise the whole screen.
+        """
+        region = self.damage.damaged()
+        if region is None:
+            self.update_stats['skipped'] += 1
+            return
+        x, y, w, h = region
+        if self.region_updates and w * h < self.width * self.height * self.full_update_ratio:
+            self._panel.partial_update(x, y, w, h)
+            self.update_stats['partial'] += 1
+        else:
+            self._panel.update()
+            self.update_stats['full'] += 1
+        self.damage.pushed()
+
+    def invalidate(self):
+        """Make the next update() push the whole screen, e.g. after drawing directly on the panel."""
+        self.damage.invalidate()
 
     def clear(self):
         color = self.theme["BACKGROUND_COLOR"]
@@ -63,8 +104,10 @@ class ScreenManager:
             
             # Proceed with decoding
             self.j.decode(x, y, jpegdec.JPEG_SCALE_FULL, dither=True)
+            self.damage.add(hash((image_base64, x, y)), x, y, self.j.get_width(), self.j.get_height())
         except Exception as e:
             print(f"Error decoding base64 image: {e}")
+            self.invalidate()
 
     def draw_centered_text(self, text, color=None, scale=8, y_offset=0):
         color = color or self.theme['MAIN_FONT_COLOR']
@@ -85,7 +128,12 @@ class ScreenManager:
         self.display.set_pen(self.get_pen(self.theme['ACCENT_COLOR']))
         self.display.line(10, 35, self.width - 10, 35)
 
-    def draw_footer(self, last_fetch_time=None):
+    def draw_footer(self, last_fetch_time=None, stale=False):
+        """
+        :param last_fetch_time: Unix timestamp of the data on screen, or None.
+        :param stale:           The data is out of date (e.g. the network is down);
+                                the timestamp is labelled and coloured as a warning.
+        """
         # Get timezone offset from config or default to 0 (UTC)
         timezone_offset = 0
         if self.config_manager:
@@ -120,7 +168,10 @@ class ScreenManager:
         last_updated_text = "Last updated: " + (date or "N/A")
         footer_y = self.height - 30
         footer_color = self.theme['FOOTER_COLOR']
-        self.draw_text(last_updated_text, 15, footer_y, scale=1, color=footer_color)
+        if stale:
+            last_updated_text = "Stale, from: " + (date or "N/A")
+        self.draw_text(last_updated_text, 15, footer_y, scale=1,
+                       color=self.theme['NEGATIVE_COLOR'] if stale else footer_color)
 
         # Draw IP address on the right
         ip_address = "IP: N/A"
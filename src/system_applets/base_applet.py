@@ -1,7 +1,16 @@
 from screen_manager import ScreenManager
+import time
+
+# How often an applet needs frames (BaseApplet.REFRESH)
+REFRESH_STATIC = "static"          # Only when its data changes
+REFRESH_PER_SECOND = "per_second"  # Once a second, e.g. clocks and countdowns
+REFRESH_ANIMATED = "animated"      # Every frame at FPS
 
 
 class BaseApplet:
+    REFRESH = REFRESH_STATIC
+    FPS = 10  # Target frame rate of animated applets
+
     def __init__(self,applet_name, screen_manager, ticks_on_screen=5):
         self.screen_manager: ScreenManager = screen_manager
         self.data_manager = None
@@ -30,12 +39,43 @@ class BaseApplet:
         print(f"Stopping applet {self.applet_name}")
         pass
 
+    async def prefetch(self):
+        """
+        Called while the previous applet is still on screen, before start().
+        Load whatever update() and draw() need beyond cached endpoint data
+        (files, parsed state) so the transition into this applet does no I/O
+        or parsing. Cached data itself is already brought into RAM by
+        DataManager.prefetch(), so the default does nothing.
+        :return: Data handed back through set_preloaded_data(), or None.
+        """
+        return None
+
+    def set_preloaded_data(self, data):
+        """Receives what prefetch() returned, just before start(). Applets overriding prefetch() keep it here."""
+        pass
+
     async def update(self):
         """Called every frame to update the applet's state."""
         print(f"Ticks: {self.ticks}")
         self.ticks += 1
         return self.should_advance or self.ticks >= self.ticks_on_screen
 
+    def content_version(self):
+        """
+        Identifies what the applet would draw right now. AppletManager only
+        redraws and pushes a frame when this changes. The default covers the
+        data of every endpoint the applet registered (see
+        DataManager.content_version), plus the current second for per-second
+        applets; applets drawing other state should extend it.
+        :return: Any comparable value, or None to redraw every frame.
+        """
+        if self.data_manager is None or self.REFRESH == REFRESH_ANIMATED:
+            return None
+        version = self.data_manager.content_version(self.applet_name)
+        if self.REFRESH == REFRESH_PER_SECOND:
+            return (version, int(time.time()))
+        return version
+
     async def draw(self):
         """Called every frame to draw the applet's output."""
         print(f"Drawing applet {self.applet_name}")
@@ -1,21 +1,241 @@
+import io
 import socket
-import gc
+import time
+import content_encoding
+from dns_cache import default_cache
+from memory_policy import default_policy
 
-def urlopen(url, data=None, method="GET"):
-    gc.collect()  
-    if data is not None and method == "GET":
-        method = "POST"
-        
+# Idle keep-alive connections, pooled per (proto, host, port)
+MAX_POOL_SIZE = 2
+IDLE_TIMEOUT_MS = 30000
+_pool = {}  # (proto, host, port) -> list of (socket, released_ms)
+pool_stats = {
+    'opened': 0,
+    'reused': 0,
+    'stale': 0
+}
+
+
+def _close(s):
+    try:
+        s.close()
+    except OSError:
+        pass
+
+
+def _take(key):
+    conns = _pool.get(key)
+    now = time.ticks_ms()
+    while conns:
+        s, released_ms = conns.pop()
+        if time.ticks_diff(now, released_ms) < IDLE_TIMEOUT_MS:
+            return s
+        _close(s)
+    return None
+
+
+def _release(key, s):
+    if sum(len(conns) for conns in _pool.values()) >= MAX_POOL_SIZE:
+        oldest_key = None
+        oldest_ms = None
+        for pool_key, conns in _pool.items():
+            if conns and (oldest_ms is None or time.ticks_diff(conns[0][1], oldest_ms) < 0):
+                oldest_key = pool_key
+                oldest_ms = conns[0][1]
+        if oldest_key is not None:
+            _close(_pool[oldest_key].pop(0)[0])
+    _pool.setdefault(key, []).append((s, time.ticks_ms()))
+
+
+def close_idle():
+    """
+    Close every pooled idle connection.
+    """
+    for conns in _pool.values():
+        for s, _ in conns:
+            _close(s)
+    _pool.clear()
+
+
+class BodyReader(io.IOBase):
+    """
+    File-like view of one response body on a socket. Decodes chunked
+    transfer-encoding as it streams, honours Content-Length, and otherwise
+    reads until the server closes the connection. Never reads past the end of
+    the body, so the socket can carry the next response afterwards.
+    """
+
+    def __init__(self, s, length, chunked):
+        """
+        :param s:       The connected socket, positioned at the start of the body.
+        :param length:  Content-Length, or -1 if unknown.
+        :param chunked: True for Transfer-Encoding: chunked.
+        """
+        self.s = s
+        self.chunked = chunked
+        self.remaining = length
+        self.chunk_left = 0
+        self.done = False
+
+    def _limit(self, size):
+        """
+        :return: How many bytes may be read next without crossing a frame boundary (0 at the end).
+        """
+        if self.done:
+            return 0
+        if self.chunked:
+            if self.chunk_left == 0:
+                self.chunk_left = int(self.s.readline().split(b";", 1)[0].strip(), 16)
+                if self.chunk_left == 0:
+                    # Last chunk: skip optional trailers up to the blank line
+                    while True:
+                        l = self.s.readline()
+                        if not l or l == b"\r\n":
+                            break
+                    self.done = True
+                    return 0
+            return min(size, self.chunk_left)
+        if self.remaining >= 0:
+            if self.remaining == 0:
+                self.done = True
+            return min(size, self.remaining)
+        return size
+
+    def _consumed(self, n):
+        if n == 0:
+            if self.chunked or self.remaining >= 0:
+                raise OSError("Connection closed before end of body")
+            self.done = True
+        elif self.chunked:
+            self.chunk_left -= n
+            if self.chunk_left == 0:
+                self.s.read(2)  # CRLF after chunk
+        elif self.remaining >= 0:
+            self.remaining -= n
+            if self.remaining == 0:
+                self.done = True
+
+    def readinto(self, buf):
+        n = self._limit(len(buf))
+        if n == 0:
+            return 0
+        got = self.s.readinto(memoryview(buf)[:n]) or 0
+        self._consumed(got)
+        return got
+
+    def read(self, size=-1):
+        if size < 0:
+            parts = []
+            while True:
+                data = self.read(512)
+                if not data:
+                    break
+                parts.append(data)
+            return b"".join(parts)
+        n = self._limit(size)
+        if n == 0:
+            return b""
+        data = self.s.read(n) or b""
+        self._consumed(len(data))
+        return data
+
+
+class Response(io.IOBase):
+    """
+    An HTTP/1.1 response. read()/readinto() stream the body, decompressing
+    gzip/deflate on the fly. close() hands the connection back to the pool
+    when the body was fully read.
+    """
+
+    # Unread bytes we are willing to drain on close() to keep the connection reusable
+    DRAIN_LIMIT = 2048
+
+    def __init__(self, s, pool_key, status, headers):
+        self.s = s
+        self.pool_key = pool_key
+        self.status = status
+        self.headers = headers
+        length = headers.get(b"content-length")
+        length = int(length) if length is not None else -1
+        if status == 204 or status == 304:
+            length = 0
+        chunked = b"chunked" in headers.get(b"transfer-encoding", b"").lower()
+        self.body = BodyReader(s, length, chunked)
+        self._reusable = (
+            (chunked or length >= 0)
+            and headers.get(b"connection", b"").lower() != b"close"
+        )
+        encoding = headers.get(b"content-encoding", b"").lower().decode()
+        if content_encoding.supported(encoding):
+            self._stream = content_encoding.open_decoder(encoding, self.body)
+        else:
+            self._stream = self.body
+
+    def readinto(self, buf):
+        if self.s is None:
+            return 0
+        return self._stream.readinto(buf)
+
+    def read(self, size=-1):
+        if self.s is None:
+            return b""
+        if size >= 0:
+            return self._stream.read(size)
+        parts = []
+        while True:
+            data = self._stream.read(512)
+            if not data:
+                break
+            parts.append(data)
+        return b"".join(parts)
+
+    def close(self):
+        if self.s is None:
+            return
+        body = self.body
+        if self._reusable and not body.done:
+            try:
+                drained = 0
+                while not body.done and drained <= self.DRAIN_LIMIT:
+                    drained += len(body.read(512))
+            except (OSError, ValueError):
+                self._reusable = False
+        s = self.s
+        self.s = None
+        self._stream = None
+        if self._reusable and body.done:
+            _release(self.pool_key, s)
+        else:
+            _close(s)
+
+
+def _connect(proto, host, port):
+    ai = default_cache.resolve(host, port)
+
+    s = socket.socket(ai[0], ai[1], ai[2])
+    try:
+        s.connect(ai[-1])
+        if proto == "https:":
+            import tls
+            context = tls.SSLContext(tls.PROTOCOL_TLS_CLIENT)
+            context.verify_mode = tls.CERT_NONE
+            s = context.wrap_socket(s, server_hostname=host)
+    except OSError:
+        s.close()
+        raise
+    return s
+
+
+def _split_url(url):
     try:
         proto, dummy, host, path = url.split("/", 3)
     except ValueError:
         proto, dummy, host = url.split("/", 2)
         path = ""
-        
+
     if proto == "http:":
         port = 80
     elif proto == "https:":
-        import tls
         port = 443
     else:
         raise ValueError("Unsupported protocol: " + proto)
@@ -23,39 +243,85 @@ def urlopen(url, data=None, method="GET"):
     if ":" in host:
         host, port = host.split(":", 1)
         port = int(port)
+    return proto, host, port, path
 
-    ai = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
-    ai = ai[0]  
 
-    s = socket.socket(ai[0], ai[1], ai[2])
-    
-    try:
-        s.connect(ai[-1])
-        if proto == "https:":
-            context = tls.SSLContext(tls.PROTOCOL_TLS_CLIENT)
-            context.verify_mode = tls.CERT_NONE
-            s = context.wrap_socket(s, server_hostname=host)
+def _request(proto, host, port, path, method, data):
+    key = (proto, host, port)
+    while True:
+        s = _take(key)
+        reused = s is not None
+        if reused:
+            pool_stats['reused'] += 1
+        else:
+            s = _connect(proto, host, port)
+            pool_stats['opened'] += 1
 
-        s.write(b"%s /%s HTTP/1.0\r\nHost: %s\r\n" % (method.encode(), path.encode(), host.encode()))
-        
-        if data:
-            s.write(b"Content-Length: %d\r\n" % len(data))
-        
-        s.write(b"\r\n")
-        
-        if data:
-            s.write(data)
+        try:
+            s.write(b"%s /%s HTTP/1.1\r\nHost: %s\r\nConnection: keep-alive\r\n" % (method.encode(), path.encode(), host.encode()))
+            if content_encoding.ACCEPT_ENCODING:
+                s.write(b"Accept-Encoding: %s\r\n" % content_encoding.ACCEPT_ENCODING.encode())
+
+            if data:
+                s.write(b"Content-Length: %d\r\n" % len(data))
+
+            s.write(b"\r\n")
+
+            if data:
+                s.write(data)
 
-        while True:
             l = s.readline()
-            if not l or l == b"\r\n":
-                break
-            if l.startswith(b"Transfer-Encoding:") and b"chunked" in l:
-                raise ValueError("Unsupported Transfer-Encoding: chunked")
-            elif l.startswith(b"Location:"):
-                raise NotImplementedError("Redirects not yet supported")
-    except OSError:
-        s.close()
-        raise
+            if not l:
+                raise OSError("Connection closed before response")
+            status = int(l.split(None, 2)[1])
 
-    return s
+            headers = {}
+            while True:
+                l = s.readline()
+                if not l or l == b"\r\n":
+                    break
+                if b":" in l:
+                    k, v = l.split(b":", 1)
+                    headers[k.strip().lower()] = v.strip()
+        except OSError:
+            s.close()
+            if reused:
+                # The server dropped the idle connection; retry on a new one
+                pool_stats['stale'] += 1
+                continue
+            raise
+        except BaseException:
+            s.close()
+            raise
+
+        return Response(s, key, status, headers)
+
+
+def urlopen(url, data=None, method="GET", max_redirects=3):
+    default_policy.checkpoint("request")
+    if data is not None and method == "GET":
+        method = "POST"
+
+    proto, host, port, path = _split_url(url)
+    for _ in range(max_redirects + 1):
+        response = _request(proto, host, port, path, method, data)
+        location = response.headers.get(b"location")
+        if response.status not in (301, 302, 303, 307, 308) or location is None:
+            return response
+
+        # Drain and pool the redirect so a same-host target reuses the connection
+        response.close()
+        location = location.decode()
+        if location.startswith("//"):
+            location = proto + location
+        if location.startswith("/"):
+            path = location[1:]
+        elif "://" in location:
+            proto, host, port, path = _split_url(location)
+        else:
+            path = path.rsplit("/", 1)[0] + "/" + location if "/" in path else location
+        if response.status == 303 or (response.status in (301, 302) and method == "POST"):
+            method = "GET"
+            data = None
+
+    raise OSError("Too many redirects")
@@ -0,0 +1,243 @@
+import uasyncio as asyncio
+import random
+import struct
+import time
+import ubinascii
+from http_client import parse_url
+from dns_cache import default_cache
+
+try:
+    import hashlib
+except ImportError:
+    hashlib = None  # Handshake answers are then accepted without checking Sec-WebSocket-Accept
+
+# RFC 6455 opcodes
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+HANDSHAKE_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class WebSocketClosed(OSError):
+    """
+    The connection was closed by the server, or must be given up
+    (protocol error, oversized message).
+    """
+
+
+def _mask(payload: bytes, key: bytes) -> bytes:
+    data = bytearray(payload)
+    for i in range(len(data)):
+        data[i] ^= key[i & 3]
+    return bytes(data)
+
+
+class WebSocketClient:
+    """
+    Minimal RFC 6455 client on uasyncio streams, for ws:// and wss:// URLs.
+    Pings from the server are answered inside recv(); a caller keeping the
+    connection alive sends its own pings with ping() and watches last_rx_ms.
+
+    Usage:
+        ws = WebSocketClient("wss://stream.example.com/ws")
+        await ws.connect()
+        message = await ws.recv()
+        await ws.close()
+    """
+
+    def __init__(self, url: str, timeout: int = 10, max_message: int = 4096, dns_cache=None) -> None:
+        """
+        :param url:         ws:// or wss:// URL.
+        :param timeout:     Seconds allowed for connecting and the opening handshake.
+        :param max_message: Largest message accepted, in bytes; larger ones close the connection.
+        :param dns_cache:   Resolver cache. Defaults to the one shared with the HTTP clients.
+        """
+        if url.startswith("wss://"):
+            self.proto, self.host, self.port, self.path = parse_url("https://" + url[6:])
+        elif url.startswith("ws://"):
+            self.proto, self.host, self.port, self.path = parse_url("http://" + url[5:])
+        else:
+            raise ValueError("Unsupported protocol: " + url.split(":", 1)[0])
+        self.url = url
+        self.timeout = timeout
+        self.max_message = max_message
+        self.dns_cache = dns_cache or default_cache
+        self.reader = None
+        self.writer = None
+        self.last_rx_ms = None  # ticks_ms() of the last frame received
+
+    async def connect(self) -> None:
+        """
+        Open the connection and perform the opening handshake.
+        :raises OSError: If the server refuses the upgrade.
+        """
+        ip = self.dns_cache.resolve_ip(self.host, self.port)
+        if self.proto == "https:":
+            import tls
+            context = tls.SSLContext(tls.PROTOCOL_TLS_CLIENT)
+            context.verify_mode = tls.CERT_NONE
+            opening = asyncio.open_connection(ip, self.port, ssl=context, server_hostname=self.host)
+        else:
+            opening = asyncio.open_connection(ip, self.port)
+        self.reader, self.writer = await asyncio.wait_for(opening, self.timeout)
+        try:
+            await asyncio.wait_for(self._handshake(), self.timeout)
+        except BaseException:
+            await self.abort()
+            raise
+        self.last_rx_ms = time.ticks_ms()
+
+    async def _handshake(self) -> None:
+        key = ubinascii.b2a_base64(bytes(random.getrandbits(8) for _ in range(16))).strip()
+        host = self.host if self.port in (80, 443) else "%s:%d" % (self.host, self.port)
+        self.writer.write(
+            b"GET %s HTTP/1.1\r\nHost: %s\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Key: %s\r\nSec-WebSocket-Version: 13\r\n\r\n"
+            % (self.path.encode(), host.encode(), key)
+        )
+        await self.writer.drain()
+
+        line = await self.reader.readline()
+        if not line:
+            raise OSError("Connection closed during handshake")
+        parts = line.split(None, 2)
+        if len(parts) < 2 or not parts[1].isdigit():
+            raise OSError("Malformed status line: %r" % line[:40])
+        status = int(parts[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if not line or line == b"\r\n":
+                break
+            if b":" in line:
+                name, value = line.split(b":", 1)
+                headers[name.strip().lower()] = value.strip()
+        if status != 101:
+            raise OSError("WebSocket upgrade refused: HTTP %d" % status)
+        sha1 = getattr(hashlib, "sha1", None)
+        if sha1 is not None:
+            expected = ubinascii.b2a_base64(sha1(key + HANDSHAKE_GUID).digest()).strip()
+            if headers.get(b"sec-websocket-accept") != expected:
+                raise OSError("Invalid Sec-WebSocket-Accept")
+
+    async def _send_frame(self, opcode: int, payload: bytes = b"") -> None:
+        if self.writer is None:
+            raise WebSocketClosed("Not connected")
+        length = len(payload)
+        if length < 126:
+            head = struct.pack("!BB", 0x80 | opcode, 0x80 | length)
+        elif length < 65536:
+            head = struct.pack("!BBH", 0x80 | opcode, 0x80 | 126, length)
+        else:
+            head = struct.pack("!BBQ", 0x80 | opcode, 0x80 | 127, length)
+        # Client frames are always masked
+        key = struct.pack("!I", random.getrandbits(32))
+        self.writer.write(head + key + _mask(payload, key))
+        await self.writer.drain()
+
+    async def _read_frame(self):
+        """
+        :return: Tuple of (fin, opcode, payload).
+        """
+        reader = self.reader  # abort() may clear self.reader while we wait
+        if reader is None:
+            raise WebSocketClosed("Not connected")
+        head = await reader.readexactly(2)
+        fin = head[0] & 0x80
+        opcode = head[0] & 0x0F
+        length = head[1] & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", await reader.readexactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", await reader.readexactly(8))[0]
+        key = await reader.readexactly(4) if head[1] & 0x80 else None
+        if length > self.max_message:
+            await self.close(1009)
+            raise WebSocketClosed("Frame of %d bytes exceeds %d" % (length, self.max_message))
+        payload = await reader.readexactly(length) if length else b""
+        if key is not None:
+            payload = _mask(payload, key)
+        self.last_rx_ms = time.ticks_ms()
+        return fin, opcode, payload
+
+    async def recv(self):
+        """
+        Wait for the next data message, answering pings meanwhile.
+        :return: str for a text message, bytes for a binary one.
+        :raises WebSocketClosed: When the server closes the connection.
+        """
+        parts = []
+        message_opcode = None
+        size = 0
+        while True:
+            try:
+                fin, opcode, payload = await self._read_frame()
+            except EOFError:
+                await self.abort()
+                raise WebSocketClosed("Connection lost")
+            if opcode == OP_PING:
+                await self._send_frame(OP_PONG, payload)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                code = struct.unpack("!H", payload[:2])[0] if len(payload) >= 2 else 1005
+                await self.close(code if code != 1005 else 1000)
+                raise WebSocketClosed("Closed by server (%d)" % code)
+
+            if opcode != OP_CONTINUATION:
+                message_opcode = opcode
+            elif message_opcode is None:
+                await self.close(1002)
+                raise WebSocketClosed("Unexpected continuation frame")
+            size += len(payload)
+            if size > self.max_message:
+                await self.close(1009)
+                raise WebSocketClosed("Message exceeds %d bytes" % self.max_message)
+            parts.append(payload)
+            if fin:
+                data = parts[0] if len(parts) == 1 else b"".join(parts)
+                return data.decode() if message_opcode == OP_TEXT else data
+
+    async def send(self, data) -> None:
+        """
+        Send a text (str) or binary (bytes) message.
+        """
+        if isinstance(data, str):
+            await self._send_frame(OP_TEXT, data.encode())
+        else:
+            await self._send_frame(OP_BINARY, data)
+
+    async def ping(self, payload: bytes = b"") -> None:
+        await self._send_frame(OP_PING, payload)
+
+    async def close(self, code: int = 1000) -> None:
+        """
+        Send a close frame (best effort) and close the connection.
+        """
+        if self.writer is None:
+            return
+        try:
+            await asyncio.wait_for(self._send_frame(OP_CLOSE, struct.pack("!H", code)), 2)
+        except (OSError, asyncio.TimeoutError):
+            pass
+        await self.abort()
+
+    async def abort(self) -> None:
+        """
+        Close the connection without a closing handshake.
+        """
+        writer = self.writer
+        self.reader = None
+        self.writer = None
+        if writer is None:
+            return
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except OSError:
+            pass